@@ -3,14 +3,15 @@ from django.core.exceptions import ValidationError
 from django.utils import timezone
 from drf_yasg.utils import swagger_serializer_method
 from rest_framework import serializers
-from sorl.thumbnail import get_thumbnail
 
 from api.v1.socials.serializers import LikeShortSerializer
-from api.v1.users.fields import Base64ImageField
+from api.v1.users.fields import Base64ImageField, MentalStateField
 from api.v1.users.serializers import (DepartmentSerializer,
                                       MentalStateSerializer, UserSerializer)
 from events.models import Category, Entry, Event, MeetingResult
 from events.validators import validate_event_data
+from users.models import MentalState
+from users.thumbnails import avatar_thumbnailer
 
 User = get_user_model()
 
@@ -29,15 +30,12 @@ class AuthorSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = (
-            'id', 'first_name', 'last_name', 'email', 'avatar', 'avatar_full'
+            'id', 'first_name', 'last_name', 'email', 'avatar', 'avatar_full',
+            'avatar_thumbnails'
         )
 
     def get_avatar(self, obj):
-        if obj.avatar_full:
-            return get_thumbnail(
-                obj.avatar_full, '120x120', crop='center', quality=99
-            ).url
-        return None
+        return avatar_thumbnailer.get_url(obj)
 
 
 class WithLikedSerializer(serializers.ModelSerializer):
@@ -131,6 +129,7 @@ class MeetingResultWriteSerializer(serializers.ModelSerializer):
     organizer = serializers.HiddenField(
         default=serializers.CurrentUserDefault()
     )
+    mental_state = MentalStateField(queryset=MentalState.objects.all())
 
     class Meta:
         model = MeetingResult
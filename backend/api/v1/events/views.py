@@ -5,14 +5,19 @@ from django.utils.decorators import method_decorator
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
+from rest_framework.decorators import action
 from rest_framework.filters import SearchFilter
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
 from api.v1.permissions import (AllowAuthorOrReadOnly, ChiefPostPermission,
                                 ChiefSafePermission, EmployeeSafePermission,
                                 HRAllPermission)
+from api.v1.users.serializers import ImageUploadSerializer
 from events.models import Category, Entry, Event, MeetingResult
+from spare_kits.images import image_uploads
 
 from .filters import EntryFilter, EventFilter
 from .serializers import (CategorySerializer, EntryReadSerializer,
@@ -56,6 +61,30 @@ class EntryViewSet(ModelViewSet):
             return EntryReadSerializer
         return EntryWriteSerializer
 
+    @swagger_auto_schema(
+        request_body=ImageUploadSerializer,
+        responses={status.HTTP_200_OK: EntryReadSerializer}
+    )
+    @action(
+        detail=True,
+        methods=['post'],
+        url_path='preview_image',
+        parser_classes=(MultiPartParser,)
+    )
+    def preview_image(self, request, *args, **kwargs):
+        """Загрузка превью записи файлом, уменьшается в фоне."""
+        image_uploads.use_temporary_files(request._request)
+        entry = self.get_object()
+        serializer = ImageUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        image_uploads.save(
+            entry, 'preview_image', serializer.validated_data['image']
+        )
+        serializer = EntryReadSerializer(
+            entry, context=self.get_serializer_context()
+        )
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
 
 class EventViewSet(ModelViewSet):
     filter_backends = (DjangoFilterBackend, SearchFilter)
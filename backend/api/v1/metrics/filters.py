@@ -1,5 +1,3 @@
-from datetime import date
-
 from django.utils import timezone
 from django_filters import rest_framework as filters
 
@@ -32,15 +30,6 @@ class SurveyFilter(filters.FilterSet):
         model = Survey
         fields = ('author', 'department', 'is_active')
 
-    @property
-    def qs(self):
-        parent = super().qs
-        exc_survey = Survey.objects.filter(
-            completedsurvey__employee=self.request.user,
-            completedsurvey__next_attempt_date__gt=date.today(),
-        ).values('id')
-        return parent.exclude(id__in=(exc_survey))
-
 
 class CompletedSurveyFilter(filters.FilterSet):
     my_results = filters.BooleanFilter(method='filter_my_results')
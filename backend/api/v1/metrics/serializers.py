@@ -2,10 +2,12 @@ from datetime import date
 
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.db.models import Count
 from django.utils import timezone
 from drf_yasg.utils import swagger_serializer_method
 from rest_framework import serializers
 
+from metrics.importers import CompletedSurveyImporter
 from metrics.models import (ActivityRate, ActivityTracker, ActivityType,
                             BurnoutTracker, CompletedSurvey, Condition,
                             LifeDirection, Question, Survey, UserLifeBalance,
@@ -136,6 +138,13 @@ class UserShortSerializer(serializers.ModelSerializer):
 
 
 class ShortSurveySerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для краткого представления опроса.
+
+    Количество вопросов берется из аннотации `questions_quantity`, если она
+    есть в выборке, иначе - из общего для запроса словаря, собранного
+    одним сгруппированным запросом по опросам сериализуемого списка.
+    """
 
     type = serializers.SlugRelatedField(slug_field='slug', read_only=True)
     questions_quantity = serializers.SerializerMethodField()
@@ -147,9 +156,41 @@ class ShortSurveySerializer(serializers.ModelSerializer):
             'questions_quantity', 'description', 'text', 'author'
         )
 
-    def get_questions_quantity(self, obj):
-        questions = obj.questions.all()
-        return questions.count()
+    def get_context_cache(self, key, builder):
+        """Значение, общее для всех сериализаторов одного запроса."""
+        if key not in self.context:
+            self.context[key] = builder()
+        return self.context[key]
+
+    def get_listed_survey_ids(self, obj) -> list:
+        """Id опросов, сериализуемых вместе с `obj` одним списком."""
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            return [survey.id for survey in parent.instance]
+        if isinstance(getattr(parent, 'parent', None),
+                      serializers.ListSerializer):
+            attname = f'{self.source}_id'
+            return [getattr(item, attname) for item in parent.parent.instance]
+        return [obj.id]
+
+    def get_questions_quantity(self, obj) -> int:
+        quantity = getattr(obj, 'questions_quantity', None)
+        if quantity is not None:
+            return quantity
+
+        quantities = self.get_context_cache('questions_quantities', dict)
+        if obj.id not in quantities:
+            survey_ids = set(self.get_listed_survey_ids(obj)) | {obj.id}
+            quantities.update(dict.fromkeys(survey_ids, 0))
+            quantities.update(
+                Question.objects
+                .filter(survey__in=survey_ids)
+                .order_by()
+                .values('survey')
+                .annotate(quantity=Count('id'))
+                .values_list('survey', 'quantity')
+            )
+        return quantities[obj.id]
 
 
 class SurveySerializer(ShortSurveySerializer):
@@ -174,11 +215,9 @@ class SurveySerializer(ShortSurveySerializer):
         questions = obj.questions.all()
 
         if questions:
-            question_data = []
-            for index, question in enumerate(questions, start=1):
-                question_dict = QuestionSerializer(question).data
+            question_data = QuestionSerializer(questions, many=True).data
+            for index, question_dict in enumerate(question_data, start=1):
                 question_dict['number'] = index
-                question_data.append(question_dict)
             return question_data
 
         return None
@@ -187,9 +226,23 @@ class SurveySerializer(ShortSurveySerializer):
         serializer_or_field=VariantSerializer(many=True)
     )
     def get_variants(self, obj):
-        variants = Variant.objects.filter(survey_type=obj.type)
-        serializer = VariantSerializer(variants, many=True)
-        return serializer.data
+        variants_by_type = self.get_context_cache(
+            'variants_by_type', self.build_variants_by_type
+        )
+        return variants_by_type.get(obj.type_id, [])
+
+    @staticmethod
+    def build_variants_by_type() -> dict:
+        """Сериализованные варианты ответов, сгруппированные по типу опроса."""
+        variants_by_type = {}
+        for variant in Variant.objects.all():
+            variants_by_type.setdefault(variant.survey_type_id, []).append(
+                variant
+            )
+        return {
+            survey_type: VariantSerializer(variants, many=True).data
+            for survey_type, variants in variants_by_type.items()
+        }
 
 
 class MentalStateSerializer(serializers.ModelSerializer):
@@ -231,7 +284,7 @@ class CompletedSurveyCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = CompletedSurvey
-        exclude = ('summary', 'next_attempt_date', 'mental_state')
+        exclude = ('summary', 'next_attempt_date', 'mental_state', 'status')
         ref_name = 'CompletedSurveyCreate'
 
     def validate(self, data):
@@ -239,7 +292,7 @@ class CompletedSurveyCreateSerializer(serializers.ModelSerializer):
         results = data.get('results', None)
         employee = self.context.get('request').user
         validate_completed_survey(
-            survey, results, employee, CompletedSurvey, Variant
+            survey, results, employee, CompletedSurvey
         )
         return data
 
@@ -248,6 +301,54 @@ class CompletedSurveyCreateSerializer(serializers.ModelSerializer):
         return CompletedSurveySerializer(instance, context=self.context).data
 
 
+class CompletedSurveyStatusSerializer(serializers.ModelSerializer):
+    """Сериализатор для опроса статуса расчета результатов."""
+
+    mental_state = MentalStateSerializer()
+
+    class Meta:
+        model = CompletedSurvey
+        fields = ('id', 'status', 'summary', 'mental_state')
+
+
+class CompletedSurveyImportSerializer(serializers.Serializer):
+    """Файл с результатами опросов для массового импорта."""
+
+    file = serializers.FileField(
+        help_text='Файл JSON Lines или CSV с результатами опросов.'
+    )
+    format = serializers.ChoiceField(
+        choices=CompletedSurveyImporter.FORMATS,
+        required=False,
+        help_text='Формат файла, по умолчанию определяется по расширению.'
+    )
+
+    def validate_file(self, file):
+        CompletedSurveyImporter.validate_encoding(file)
+        return file
+
+    def validate(self, data):
+        if not data.get('format'):
+            data['format'] = CompletedSurveyImporter.detect_format(
+                data['file'].name
+            )
+        if not data['format']:
+            raise serializers.ValidationError(
+                {'format': 'Не удалось определить формат файла.'}
+            )
+        return data
+
+
+class ImportRowErrorSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    errors = serializers.ListField(child=serializers.CharField())
+
+
+class CompletedSurveyImportResultSerializer(serializers.Serializer):
+    created = serializers.IntegerField()
+    errors = ImportRowErrorSerializer(many=True)
+
+
 class MentalStateReadSerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -270,6 +371,37 @@ class MonthlyBurnoutSerializer(serializers.Serializer):
     percentage = serializers.FloatField()
 
 
+class BurnoutGraphParamsSerializer(serializers.Serializer):
+    """Параметры построения графика выгорания."""
+
+    year = serializers.IntegerField(
+        required=False, min_value=2000, max_value=2100,
+        help_text='Календарный год, по умолчанию текущий.'
+    )
+    months = serializers.IntegerField(
+        required=False, min_value=1, max_value=36,
+        help_text=(
+            'Скользящее окно в месяцах, заканчивающееся текущим месяцем. '
+            'При указании параметр year игнорируется.'
+        )
+    )
+    department = serializers.IntegerField(required=False)
+    position = serializers.IntegerField(required=False)
+
+
+class CompletedSurveyCreateParamsSerializer(serializers.Serializer):
+    """Параметры сохранения результатов опроса."""
+
+    async_scoring = serializers.BooleanField(
+        default=False,
+        help_text=(
+            'Сохранить результаты без расчета и рассчитать их в фоне. '
+            'Статус расчета доступен по адресу '
+            '/metrics/surveys/results/{id}/status.'
+        )
+    )
+
+
 class ActivityTypeSerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -1,12 +1,15 @@
+from datetime import date
+
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.db.models import Avg, Count, F, IntegerField, Q
-from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.generics import ListAPIView
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
@@ -17,9 +20,14 @@ from api.v1.metrics.serializers import (ActivityAverageSerializer,
                                         ActivityTrackerCreateSerializer,
                                         ActivityTrackerSerializer,
                                         ActivityTypeSerializer,
+                                        BurnoutGraphParamsSerializer,
                                         BurnoutSerializer,
+                                        CompletedSurveyCreateParamsSerializer,
                                         CompletedSurveyCreateSerializer,
+                                        CompletedSurveyImportResultSerializer,
+                                        CompletedSurveyImportSerializer,
                                         CompletedSurveySerializer,
+                                        CompletedSurveyStatusSerializer,
                                         ConditionReadSerializer,
                                         ConditionWriteSerializer,
                                         LifeBalanceCreateSerializer,
@@ -31,10 +39,14 @@ from api.v1.metrics.serializers import (ActivityAverageSerializer,
                                         SurveySerializer)
 from api.v1.permissions import (ChiefSafePermission, EmployeeSafePermission,
                                 HRAllPermission)
+from metrics.aggregations import BurnoutAggregation, BurnoutRollupAggregation
+from metrics.importers import CompletedSurveyImporter
 from metrics.models import (ActivityRate, ActivityTracker, ActivityType,
-                            BurnoutTracker, CompletedSurvey, Condition,
-                            LifeDirection, Survey, UserLifeBalance)
+                            BurnoutRollup, BurnoutTracker, CompletedSurvey,
+                            Condition, LifeDirection, Survey, UserLifeBalance)
+from metrics.tasks import score_completed_survey
 from users.models import MentalState
+from users.registry import mental_states
 
 from .filters import ActivityFilter, SurveyFilter
 
@@ -92,56 +104,10 @@ class BurnoutViewSet(ModelViewSet):
             employee=self.request.user.id).select_related(
             'employee', 'mental_state')
 
-    def get_yearly_burnout_percentage(self, queryset):
-        now = timezone.now()
-        queryset = queryset.filter(date__year=(now.year))
-
-        month_names = {
-            1: 'янв',
-            2: 'фев',
-            3: 'март',
-            4: 'апр',
-            5: 'май',
-            6: 'июнь',
-            7: 'июль',
-            8: 'авг',
-            9: 'сент',
-            10: 'окт',
-            11: 'ноя',
-            12: 'дек',
-        }
-
-        serialized_data = []
-
-        for month in range(1, 13):
-            filtered_queryset = queryset.filter(date__month=month)
-            count_by_level = (
-                filtered_queryset
-                .values('mental_state__level')
-                .annotate(count=Count('id'))
-            )
-            total_count = sum(item['count'] for item in count_by_level)
-            percentage = {
-                1: 0,
-                2: 50,
-                3: 100,
-            }
-            burnout_percentage = 0.0
-            if total_count > 0:
-                burnout_percentage = sum(
-                    percentage[item['mental_state__level']] * item['count']
-                    for item in count_by_level) / total_count
-            month_name = month_names[month]
-            serialized_data.append({
-                'month': month_name,
-                'percentage': burnout_percentage
-            })
-
-        return serialized_data
-
-    @swagger_auto_schema(responses={
-        status.HTTP_200_OK: MonthlyBurnoutSerializer(many=True)
-    })
+    @swagger_auto_schema(
+        query_serializer=BurnoutGraphParamsSerializer,
+        responses={status.HTTP_200_OK: MonthlyBurnoutSerializer(many=True)}
+    )
     @action(
         detail=False,
         methods=['get'],
@@ -149,15 +115,28 @@ class BurnoutViewSet(ModelViewSet):
         serializer_class=MonthlyBurnoutSerializer
     )
     def graph_data(self, request, *args, **kwargs):
+        params = BurnoutGraphParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        # по всей организации данные берутся из сводки, а не из трекера
+        if self.request.user.is_hr and not any(
+            field in request.query_params for field in self.filterset_fields
+        ):
+            burnout_data = BurnoutRollupAggregation(
+                **params.validated_data
+            ).get_data(BurnoutRollup.objects.all())
+            return Response(
+                self.get_serializer(burnout_data, many=True).data
+            )
+
         queryset = self.filter_queryset(self.get_queryset())
 
-        if self.request.user.is_authenticated and self.request.user.is_hr:
-            burnout_data = self.get_yearly_burnout_percentage(queryset)
-        else:
-            filtered_queryset = queryset.filter(employee=self.request.user.id)
-            burnout_data = self.get_yearly_burnout_percentage(
-                filtered_queryset
-            )
+        if not self.request.user.is_hr:
+            queryset = queryset.filter(employee=self.request.user.id)
+
+        burnout_data = BurnoutAggregation(
+            **params.validated_data
+        ).get_data(queryset)
 
         return Response(self.get_serializer(burnout_data, many=True).data)
 
@@ -198,15 +177,18 @@ class SurveyViewSet(ModelViewSet):
         queryset = (
             Survey.objects
             .filter(
-                Q(author=self.request.user)
-                | Q(for_all=True)
-                | Q(department=self.request.user.department)
+                Q(availabilities__next_available_date__isnull=True)
+                | Q(availabilities__next_available_date__lte=date.today()),
+                availabilities__user=self.request.user,
             )
             .select_related('author', 'type')
-            .prefetch_related('department', 'questions')
+            .annotate(
+                questions_quantity=Count('questions', distinct=True)
+            )
         )
-
-        return queryset.all()
+        if self.action == 'retrieve':
+            return queryset.prefetch_related('questions')
+        return queryset
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -217,11 +199,12 @@ class SurveyViewSet(ModelViewSet):
 
 
 @method_decorator(name='create', decorator=swagger_auto_schema(
+    query_serializer=CompletedSurveyCreateParamsSerializer,
     responses={status.HTTP_201_CREATED: CompletedSurveySerializer}
 ))
 class CompletedSurveyViewSet(ModelViewSet):
     queryset = CompletedSurvey.objects.select_related(
-        'employee', 'survey', 'mental_state'
+        'employee', 'survey__type', 'mental_state'
     ).all()
     filter_backends = (DjangoFilterBackend,)
     filterset_class = CompletedSurveyFilter
@@ -229,6 +212,8 @@ class CompletedSurveyViewSet(ModelViewSet):
     permission_classes = (IsAuthenticated,)
 
     def get_permissions(self):
+        if self.action == 'scoring_status':
+            return super().get_permissions()
         if self.request.method == 'GET':
             self.permission_classes = (HRAllPermission,)
             my_results = self.request.query_params.get('my_results')
@@ -236,11 +221,76 @@ class CompletedSurveyViewSet(ModelViewSet):
                 self.permission_classes = (IsAuthenticated,)
         return super().get_permissions()
 
+    def get_queryset(self):
+        if self.action != 'scoring_status':
+            return super().get_queryset()
+
+        queryset = (
+            CompletedSurvey.objects
+            .select_related('mental_state')
+            .only('id', 'employee_id', 'status', 'summary', 'mental_state')
+        )
+        if self.request.user.is_hr:
+            return queryset
+        return queryset.filter(employee=self.request.user)
+
     def get_serializer_class(self):
+        if self.action in ('scoring_status', 'import_results'):
+            return self.serializer_class
         if self.request.method == 'GET':
             return CompletedSurveySerializer
         return CompletedSurveyCreateSerializer
 
+    def perform_create(self, serializer):
+        params = CompletedSurveyCreateParamsSerializer(
+            data=self.request.query_params
+        )
+        params.is_valid(raise_exception=True)
+        if params.validated_data['async_scoring']:
+            instance = serializer.save(status=CompletedSurvey.Status.PENDING)
+            transaction.on_commit(
+                lambda: score_completed_survey.delay(instance.id)
+            )
+        else:
+            serializer.save()
+
+    @action(
+        detail=True,
+        methods=['get'],
+        url_path='status',
+        serializer_class=CompletedSurveyStatusSerializer,
+        filter_backends=(),
+    )
+    def scoring_status(self, request, *args, **kwargs):
+        """Статус расчета результатов прохождения опроса."""
+        return Response(self.get_serializer(self.get_object()).data)
+
+    @swagger_auto_schema(
+        responses={status.HTTP_200_OK: CompletedSurveyImportResultSerializer}
+    )
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='import',
+        serializer_class=CompletedSurveyImportSerializer,
+        parser_classes=(MultiPartParser,),
+        permission_classes=(HRAllPermission,),
+    )
+    def import_results(self, request, *args, **kwargs):
+        """Массовый импорт результатов опросов из файла JSON Lines или CSV."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        lines = CompletedSurveyImporter.decode(
+            serializer.validated_data['file']
+        )
+        result = CompletedSurveyImporter().run(
+            lines, serializer.validated_data['format']
+        )
+        return Response(
+            CompletedSurveyImportResultSerializer(result).data,
+            status=status.HTTP_200_OK
+        )
+
 
 class MentalStateViewSet(ListAPIView):
     queryset = MentalState.objects.all()
@@ -248,6 +298,9 @@ class MentalStateViewSet(ListAPIView):
     serializer_class = MentalStateReadSerializer
     permission_classes = (IsAuthenticated,)
 
+    def get_queryset(self):
+        return mental_states.all()
+
 
 class ActivityTypeListView(ListAPIView):
     queryset = ActivityType.objects.all()
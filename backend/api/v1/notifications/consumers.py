@@ -1,44 +1,189 @@
+import asyncio
 import json
+from urllib.parse import parse_qs
 
 from asgiref.sync import sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.db.models import Q
 
+from notifications.delivery import (BROADCAST_GROUP, department_group_name,
+                                    get_sequence, get_stored_delta,
+                                    user_group_name)
 from notifications.models import Notification
+from notifications.presence import presence
+from notifications.unread import unread_cache
+
+User = get_user_model()
 
 
 class UserNotifyConsumer(AsyncWebsocketConsumer):
-    @sync_to_async
-    def get_list_notifications(self):
+    """
+    Сокет уведомлений пользователя.
+
+    Строка запроса - id пользователя (`?5`) или параметры `id` и `protocol`
+    (`?id=5&protocol=2`).
+
+    Протокол 1 (по умолчанию): при подключении и при каждом изменении
+    отправляется полный список непросмотренных уведомлений
+    `{'message': {'notifications': [...]}}`.
+
+    Протокол 2: при подключении отправляется полный список с номером версии
+    `{'message': {'seq': 12, 'notifications': [...]}}`, дальше - только
+    изменения `{'message': {'seq': 13, 'added': [...], 'removed': [...],
+    'viewed': [...]}}`. Клиент, пропустивший версию, отправляет
+    `{"action": "resync", "seq": 12}` и получает полный список, если его
+    версия устарела, либо `{'message': {'seq': 12, 'up_to_date': true}}`.
+    Запрос `resync` также переключает сокет на протокол 2.
+
+    Кроме группы пользователя сокет состоит в общей группе и в группе
+    отдела пользователя. О событиях для всех или для отделов в группу
+    отправляется одно сообщение, а изменения списка, вычисленные при
+    доставке, сокет забирает из Redis.
+
+    Пока сокет открыт, пользователь считается в сети и не получает писем
+    о новых уведомлениях. Сокет сам продлевает присутствие, клиент может
+    дополнительно отправлять `{"action": "ping"}`.
+    """
+
+    protocol = 1
+    seq = None
+    heartbeat = None
+
+    def load_list_notifications(self):
+        notifications = unread_cache.get_list(self.ws_id)
+        if notifications is not None:
+            return notifications
         return list(Notification.objects.filter(
             Q(user_id=self.ws_id) & Q(is_viewed=False)
         ).values(
             'id', 'incident_type', 'incident_id',
         ))
 
+    @sync_to_async
+    def get_list_notifications(self):
+        return self.load_list_notifications()
+
+    @sync_to_async
+    def get_group_names(self):
+        department_id = (
+            User.objects
+            .filter(id=self.ws_id)
+            .values_list('department_id', flat=True)
+            .first()
+        )
+        groups = [user_group_name(self.ws_id), BROADCAST_GROUP]
+        if department_id:
+            groups.append(department_group_name(department_id))
+        return groups
+
+    @sync_to_async
+    def get_stored_delta(self):
+        return get_stored_delta(self.ws_id)
+
+    @sync_to_async
+    def get_sequence(self):
+        return get_sequence(self.ws_id)
+
+    @sync_to_async
+    def touch_presence(self):
+        presence.touch(self.ws_id, self.channel_name)
+
+    @sync_to_async
+    def leave_presence(self):
+        presence.leave(self.ws_id, self.channel_name)
+
+    async def keep_presence(self):
+        while True:
+            await asyncio.sleep(settings.NOTIFICATIONS_PRESENCE_HEARTBEAT)
+            await self.touch_presence()
+
+    def parse_query_string(self):
+        query_string = self.scope['query_string'].decode()
+        if query_string.isdigit():
+            return int(query_string), 1
+        params = parse_qs(query_string)
+        protocol = 2 if params.get('protocol') == ['2'] else 1
+        return int(params['id'][0]), protocol
+
+    async def send_message(self, message):
+        if 'seq' in message:
+            self.seq = message['seq']
+        await self.send(json.dumps({'message': message}, ensure_ascii=False))
+
+    async def send_full_list(self):
+        # версия читается до списка: изменения между чтениями
+        # придут повторно, а их применение идемпотентно
+        sequence = await self.get_sequence()
+        message = {'notifications': await self.get_list_notifications()}
+        if self.protocol == 2:
+            message['seq'] = sequence
+        self.seq = sequence
+        await self.send_message(message)
+
     async def connect(self):
         if self.scope['query_string']:
-            self.ws_id = int(self.scope['query_string'])
-            self.group_name = 'user_%s' % self.ws_id
-            await self.channel_layer.group_add(
-                self.group_name, self.channel_name
-            )
+            self.ws_id, self.protocol = self.parse_query_string()
+            self.group_names = await self.get_group_names()
+            for group_name in self.group_names:
+                await self.channel_layer.group_add(
+                    group_name, self.channel_name
+                )
             await self.accept()
-            notifications = await self.get_list_notifications()
-            await self.send(json.dumps(
-                {'message': {
-                    'notifications': notifications
-                }},
-                ensure_ascii=False,
-            ))
+            await self.touch_presence()
+            self.heartbeat = asyncio.create_task(self.keep_presence())
+            await self.send_full_list()
 
     async def disconnect(self, close_code):
-        if self.scope['query_string']:
+        if self.heartbeat is not None:
+            self.heartbeat.cancel()
+            await self.leave_presence()
+        for group_name in getattr(self, 'group_names', ()):
             await self.channel_layer.group_discard(
-                self.group_name, self.channel_name
+                group_name, self.channel_name
             )
         await self.close()
 
+    async def receive(self, text_data=None, bytes_data=None):
+        try:
+            data = json.loads(text_data or '')
+        except ValueError:
+            return
+        if not isinstance(data, dict):
+            return
+        if data.get('action') == 'ping':
+            await self.touch_presence()
+            return
+        if data.get('action') != 'resync':
+            return
+
+        self.protocol = 2
+        sequence = await self.get_sequence()
+        if data.get('seq') == sequence:
+            await self.send_message({'seq': sequence, 'up_to_date': True})
+        else:
+            await self.send_full_list()
+
     async def notification(self, event):
         message = event['message']
-        await self.send(json.dumps({'message': message}, ensure_ascii=False))
+        if self.protocol == 1 and 'seq' in message:
+            await self.send_full_list()
+            return
+        await self.send_message(message)
+
+    async def notification_incident(self, event):
+        """
+        Событие для всех или для отдела.
+
+        Отправляются изменения, сохраненные при доставке уведомлений.
+        Если сокет пропустил версию или использует протокол 1,
+        отправляется полный список.
+        """
+        delta = await self.get_stored_delta()
+        if delta is None or delta['seq'] <= (self.seq or 0):
+            return
+        if self.protocol == 2 and delta['seq'] == self.seq + 1:
+            await self.send_message(delta)
+        else:
+            await self.send_full_list()
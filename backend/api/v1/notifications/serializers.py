@@ -8,3 +8,43 @@ class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = '__all__'
+
+
+class UnreadCountSerializer(serializers.Serializer):
+    count = serializers.IntegerField()
+
+
+class NotificationBulkSerializer(serializers.Serializer):
+    """Условия отбора уведомлений для массовых действий."""
+
+    all = serializers.BooleanField(
+        required=False, default=False,
+        help_text='Все уведомления пользователя.'
+    )
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False, max_length=1000,
+        help_text='id уведомлений.'
+    )
+    incident_type = serializers.ChoiceField(
+        choices=Notification.IncidentType.choices, required=False,
+        help_text='Тип уведомлений.'
+    )
+    before_date = serializers.DateField(
+        required=False,
+        help_text='Уведомления, созданные до указанной даты.'
+    )
+
+    def validate(self, data):
+        criteria = {
+            key: value for key, value in data.items() if key != 'all'
+        }
+        if not criteria and not data['all']:
+            raise serializers.ValidationError(
+                'Укажите условия отбора уведомлений или all=true.'
+            )
+        return criteria
+
+
+class NotificationBulkResultSerializer(serializers.Serializer):
+    count = serializers.IntegerField()
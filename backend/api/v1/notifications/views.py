@@ -1,20 +1,26 @@
 from django_filters.rest_framework import DjangoFilterBackend
+from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.viewsets import ReadOnlyModelViewSet
 
 from api.v1.notifications.filters import NotificationFilter
-from api.v1.notifications.serializers import NotificationSerializer
+from api.v1.notifications.serializers import (NotificationBulkResultSerializer,
+                                              NotificationBulkSerializer,
+                                              NotificationSerializer,
+                                              UnreadCountSerializer)
 from api.v1.permissions import NotificationUserOnly
 from notifications.models import Notification
+from notifications.service import notification_service
+from notifications.unread import unread_cache
 
 
-class NotificationViewSet(ModelViewSet):
+class NotificationViewSet(ReadOnlyModelViewSet):
     filter_backends = (DjangoFilterBackend,)
     filterset_class = NotificationFilter
-    http_method_names = ('get',)
+    http_method_names = ('get', 'post')
     permission_classes = (IsAuthenticated,)
     serializer_class = NotificationSerializer
 
@@ -39,3 +45,62 @@ class NotificationViewSet(ModelViewSet):
         notification.save()
         serializer = self.serializer_class(notification)
         return Response(serializer.data, status.HTTP_200_OK)
+
+    @swagger_auto_schema(responses={status.HTTP_200_OK: UnreadCountSerializer})
+    @action(
+        methods=['get'], detail=False, url_path='unread_count',
+    )
+    def unread_count(self, request):
+        """Количество непросмотренных уведомлений текущего пользователя."""
+        serializer = UnreadCountSerializer(
+            {'count': unread_cache.get_count(request.user.id)}
+        )
+        return Response(serializer.data, status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        request_body=NotificationBulkSerializer,
+        responses={status.HTTP_200_OK: NotificationBulkResultSerializer}
+    )
+    @action(
+        methods=['post'], detail=False, url_path='mark_viewed',
+    )
+    def mark_viewed(self, request):
+        """
+        Отмечает уведомления текущего пользователя просмотренными.
+
+        Условия `ids`, `incident_type` и `before_date` объединяются,
+        `all=true` - все уведомления. Пользователь получает одно
+        обновление в вебсокет.
+        """
+        serializer = NotificationBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        count = notification_service.mark_viewed(
+            request.user.id, **serializer.validated_data
+        )
+        return Response(
+            NotificationBulkResultSerializer({'count': count}).data,
+            status.HTTP_200_OK
+        )
+
+    @swagger_auto_schema(
+        request_body=NotificationBulkSerializer,
+        responses={status.HTTP_200_OK: NotificationBulkResultSerializer}
+    )
+    @action(
+        methods=['post'], detail=False, url_path='bulk_delete',
+    )
+    def bulk_delete(self, request):
+        """
+        Удаляет уведомления текущего пользователя.
+
+        Условия отбора такие же, как у `mark_viewed`.
+        """
+        serializer = NotificationBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        count = notification_service.delete(
+            request.user.id, **serializer.validated_data
+        )
+        return Response(
+            NotificationBulkResultSerializer({'count': count}).data,
+            status.HTTP_200_OK
+        )
@@ -1,9 +1,9 @@
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from rest_framework import serializers
-from sorl.thumbnail import get_thumbnail
 
 from socials.models import ContactForm, HelpType, Like, NeedHelp, Status
+from users.thumbnails import avatar_thumbnailer
 
 User = get_user_model()
 
@@ -16,15 +16,12 @@ class SpecialistsSerializer(serializers.ModelSerializer):
         model = User
         fields = (
             'id', 'first_name', 'last_name', 'patronymic', 'role',
-            'department', 'position', 'avatar', 'avatar_full'
+            'department', 'position', 'avatar', 'avatar_full',
+            'avatar_thumbnails'
         )
 
     def get_avatar(self, obj):
-        if obj.avatar_full:
-            return get_thumbnail(
-                obj.avatar_full, '120x120', crop='center', quality=99
-            ).url
-        return None
+        return avatar_thumbnailer.get_url(obj)
 
 
 class HelpTypeSerializer(serializers.ModelSerializer):
@@ -5,6 +5,8 @@ from django.core.files.base import ContentFile
 from PIL import Image
 from rest_framework import serializers
 
+from users.registry import mental_states
+
 
 class Base64ImageField(serializers.ImageField):
     def to_internal_value(self, data):
@@ -22,3 +24,16 @@ class Base64ImageField(serializers.ImageField):
             output.seek(0)
             data = ContentFile(output.read(), name='temp.' + ext)
         return super().to_internal_value(data)
+
+
+class MentalStateField(serializers.PrimaryKeyRelatedField):
+    """Состояние по id, берется из реестра без запроса к БД."""
+
+    def to_internal_value(self, data):
+        try:
+            state = mental_states.get_by_id(int(data))
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if state is None:
+            self.fail('does_not_exist', pk_value=data)
+        return state
@@ -9,12 +9,13 @@ from rest_framework import serializers
 from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.serializers import (TokenObtainPairSerializer,
                                                   TokenRefreshSerializer)
-from sorl.thumbnail import get_thumbnail
 
 from api.v1.metrics.serializers import ConditionReadSerializer
 from metrics.models import ActivityTracker
+from spare_kits.images import image_uploads
 from users.models import (Department, Hobby, MentalState, Position,
                           TelegramCode, TelegramUser)
+from users.thumbnails import avatar_thumbnailer
 
 from .fields import Base64ImageField
 
@@ -70,31 +71,39 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = (
             'id', 'email', 'first_name', 'last_name', 'patronymic', 'role',
-            'avatar', 'avatar_full', 'about', 'phone', 'date_joined',
-            'mental_state', 'latest_condition', 'latest_activity', 'position',
-            'department', 'hobbies',
+            'avatar', 'avatar_full', 'avatar_thumbnails', 'about', 'phone',
+            'date_joined', 'mental_state', 'latest_condition',
+            'latest_activity', 'position', 'department', 'hobbies',
         )
 
+    @staticmethod
+    def get_latest(obj, attr, related_name):
+        """Последняя запись из `attr` или из базы, если не загружена."""
+        if hasattr(obj, attr):
+            latest = getattr(obj, attr)
+            return latest[0] if latest else None
+        return getattr(obj, related_name).order_by('-date').first()
+
     @swagger_serializer_method(serializer_or_field=ConditionReadSerializer)
     def get_latest_condition(self, obj):
-        latest_condition = obj.condition_set.order_by('-date').first()
+        latest_condition = self.get_latest(
+            obj, 'latest_conditions', 'condition_set'
+        )
         if not latest_condition:
             return None
         return ConditionReadSerializer(latest_condition).data
 
     @swagger_serializer_method(serializer_or_field=ActivitySerializer)
     def get_latest_activity(self, obj):
-        latest_activity = obj.activity_trackers.order_by('-date').first()
+        latest_activity = self.get_latest(
+            obj, 'latest_activities', 'activity_trackers'
+        )
         if not latest_activity:
             return None
         return ActivitySerializer(latest_activity).data
 
     def get_avatar(self, obj):
-        if obj.avatar_full:
-            return get_thumbnail(
-                obj.avatar_full, '120x120', crop='center', quality=99
-            ).url
-        return None
+        return avatar_thumbnailer.get_url(obj)
 
 
 class UserSelfUpdateSerializer(serializers.ModelSerializer):
@@ -116,6 +125,12 @@ class UserSelfUpdateSerializer(serializers.ModelSerializer):
         return UserSerializer(instance, context=self.context).data
 
 
+class ImageUploadSerializer(serializers.Serializer):
+    """Изображение из multipart-запроса, проверяется по заголовкам."""
+
+    image = serializers.FileField(validators=[image_uploads.validate])
+
+
 class UserUpdateSerializer(serializers.ModelSerializer):
     """Для редактирования профилей сотрудников HR'ом."""
 
@@ -16,6 +16,11 @@ urlpatterns = [
         views.CurrentUserView.as_view(),
         name='current_user'
     ),
+    re_path(
+        r'^users/current_user/avatar/?$',
+        views.CurrentUserAvatarView.as_view(),
+        name='current_user_avatar'
+    ),
     re_path(
         r'^users/send_invite/?$',
         views.SendInviteView.as_view(),
@@ -4,12 +4,14 @@ import uuid
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.hashers import make_password
+from django.db.models import Prefetch
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
 from rest_framework.filters import SearchFilter
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -18,15 +20,18 @@ from rest_framework_simplejwt.tokens import RefreshToken
 
 from api.v1.permissions import (AllReadOnlyPermissions, ChiefSafePermission,
                                 HRAllPermission)
+from metrics.models import ActivityTracker, Condition
 from spare_kits import invite_service
+from spare_kits.images import image_uploads
 from users.documents import HobbyDocument
 from users.models import (Department, Hobby, InviteCode, PasswordResetCode,
                           Position, TelegramCode, TelegramUser)
+from users.tasks import generate_avatar_thumbnails
 
 from .filters import (DepartmentInviteCodeFilter, ElasticSearchFilter,
                       PositionInviteCodeFilter)
 from .serializers import (DepartmentSerializer, HobbySerializer,
-                          PasswordChangeSerializer,
+                          ImageUploadSerializer, PasswordChangeSerializer,
                           PasswordResetConfirmSerializer,
                           PasswordResetSerializer, PositionSerializer,
                           RegisterSerializer, SendInviteSerializer,
@@ -51,7 +56,20 @@ class UserViewSet(ModelViewSet):
             User.objects
             .filter(is_active=True, is_superuser=False)
             .select_related('position', 'department', 'mental_state')
-            .prefetch_related('condition_set', 'hobbies', 'activity_trackers')
+            .prefetch_related(
+                'hobbies',
+                # только последние записи, одним запросом на всю страницу
+                Prefetch(
+                    'condition_set',
+                    queryset=Condition.objects.order_by('-date')[:1],
+                    to_attr='latest_conditions'
+                ),
+                Prefetch(
+                    'activity_trackers',
+                    queryset=ActivityTracker.objects.order_by('-date')[:1],
+                    to_attr='latest_activities'
+                ),
+            )
         )
 
     @swagger_auto_schema(request_body=UserUpdateSerializer)
@@ -102,6 +120,34 @@ class CurrentUserView(APIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+class CurrentUserAvatarView(APIView):
+    """
+    Загрузка аватара текущего пользователя файлом.
+
+    Файл сохраняется без обработки, уменьшение и миниатюры создаются
+    в фоне. До их создания в `avatar` возвращается исходный файл.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    parser_classes = (MultiPartParser,)
+
+    @swagger_auto_schema(
+        request_body=ImageUploadSerializer,
+        responses={status.HTTP_200_OK: UserSerializer}
+    )
+    def post(self, request):
+        image_uploads.use_temporary_files(request._request)
+        serializer = ImageUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = request.user
+        image_uploads.save(
+            user, 'avatar_full', serializer.validated_data['image'],
+            link=generate_avatar_thumbnails.si(user.id),
+            avatar_thumbnails={}
+        )
+        return Response(UserSerializer(user).data, status=status.HTTP_200_OK)
+
+
 class SendInviteView(APIView):
     """Отправка на почту ссылки для регистрации."""
 
@@ -118,6 +118,27 @@ CHANNEL_LAYERS = {
     }
 }
 
+REDIS_URL = os.getenv(
+    'REDIS_URL',
+    default='redis://{}:{}/4'.format(
+        os.getenv('REDIS_HOST', default='localhost'),
+        os.getenv('REDIS_PORT', default='6379')
+    )
+)
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION',
+            default='redis://{}:{}/3'.format(
+                os.getenv('REDIS_HOST', default='localhost'),
+                os.getenv('REDIS_PORT', default='6379')
+            )
+        ),
+    }
+}
+
 DJOSER = {
     'LOGIN_FIELD': 'email'
 }
@@ -194,6 +215,9 @@ MEDIA_URL = '/media/'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+IMAGE_UPLOAD_MAX_SIZE = int(os.getenv('IMAGE_UPLOAD_MAX_SIZE', default=10 * 2 ** 20))
+IMAGE_UPLOAD_MAX_PIXELS = int(os.getenv('IMAGE_UPLOAD_MAX_PIXELS', default=40_000_000))
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # ----------------------------------------------------------------
@@ -221,6 +245,18 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 CONTACT_EMAIL = os.getenv('CONTACT_EMAIL')
 
+# очередь писем: задержка запуска отправки, размер пачки, писем в секунду
+# (0 - без ограничения), время работы одной задачи в секундах
+EMAIL_OUTBOX_DELAY = int(os.getenv('EMAIL_OUTBOX_DELAY', default=5))
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', default=50))
+EMAIL_OUTBOX_RATE = float(os.getenv('EMAIL_OUTBOX_RATE', default=10))
+EMAIL_OUTBOX_TIME_BUDGET = int(os.getenv('EMAIL_OUTBOX_TIME_BUDGET', default=50))
+# повторы: количество попыток, задержка первого повтора в секундах и время,
+# через которое письма зависшего обработчика забирают другие
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', default=5))
+EMAIL_OUTBOX_RETRY_DELAY = int(os.getenv('EMAIL_OUTBOX_RETRY_DELAY', default=60))
+EMAIL_OUTBOX_CLAIM_TIMEOUT = int(os.getenv('EMAIL_OUTBOX_CLAIM_TIMEOUT', default=300))
+
 # ----------------------------------------------------------------
 
 INVITE_TIME_EXPIRES_DAYS = 7
@@ -316,8 +352,61 @@ CELERY_BEAT_SCHEDULE = {
             'days': os.getenv('NOTIFICATIONS_AGE_DELETE'),
         }
     },
+    'create_notification_partitions_every_month': {
+        'task': 'create_notification_partitions',
+        'schedule': crontab(minute=0, hour=2, day_of_month=1),
+    },
+    'drain_email_outbox_every_minute': {
+        'task': 'drain_email_outbox',
+        'schedule': crontab(),
+    },
+    'send_notification_digests_every_hour': {
+        'task': 'send_notification_digests',
+        'schedule': crontab(minute=0),
+    },
+    'generate_missing_avatar_thumbnails_every_hour': {
+        'task': 'generate_missing_avatar_thumbnails',
+        'schedule': crontab(minute=30),
+    },
+    'rebuild_burnout_rollup_every_day': {
+        'task': 'rebuild_burnout_rollup',
+        'schedule': crontab(minute=0, hour=4),
+    },
     'check_everyday_and_send_survey_notifications': {
         'task': 'send_survey_notifications',
         'schedule': crontab(minute=0, hour=12),
     },
 }
+
+# ----------------------------------------------------------------
+
+NOTIFICATIONS_FANOUT_CHUNK_SIZE = int(os.getenv('NOTIFICATIONS_FANOUT_CHUNK_SIZE', default=500))
+NOTIFICATIONS_FANOUT_CONCURRENCY = int(os.getenv('NOTIFICATIONS_FANOUT_CONCURRENCY', default=8))
+
+# окно, в течение которого уведомления пользователю копятся и доставляются
+# одной отправкой, в секундах; для отдельных типов уведомлений - свое
+NOTIFICATIONS_DEBOUNCE_WINDOW = int(os.getenv('NOTIFICATIONS_DEBOUNCE_WINDOW', default=60))
+NOTIFICATIONS_DEBOUNCE_WINDOWS = {
+    'Помощь': 0,
+}
+
+# удаление старых уведомлений: размер пачки, пауза между пачками и время
+# работы одной задачи в секундах
+NOTIFICATIONS_RETENTION_CHUNK_SIZE = int(os.getenv('NOTIFICATIONS_RETENTION_CHUNK_SIZE', default=5000))
+NOTIFICATIONS_RETENTION_PAUSE = float(os.getenv('NOTIFICATIONS_RETENTION_PAUSE', default=0.5))
+NOTIFICATIONS_RETENTION_TIME_BUDGET = int(os.getenv('NOTIFICATIONS_RETENTION_TIME_BUDGET', default=240))
+
+# на сколько месяцев вперед создаются секции таблицы уведомлений,
+# если она секционирована командой `notification_partitions --setup`
+NOTIFICATIONS_PARTITIONS_AHEAD = int(os.getenv('NOTIFICATIONS_PARTITIONS_AHEAD', default=3))
+
+# пользователь в сети, пока его вебсокет продлевает присутствие каждые
+# HEARTBEAT секунд; без продления присутствие истекает через TIMEOUT секунд
+NOTIFICATIONS_PRESENCE_HEARTBEAT = int(os.getenv('NOTIFICATIONS_PRESENCE_HEARTBEAT', default=30))
+NOTIFICATIONS_PRESENCE_TIMEOUT = int(os.getenv('NOTIFICATIONS_PRESENCE_TIMEOUT', default=90))
+
+# письма о новых уведомлениях копятся и отправляются раз в час одним письмом
+NOTIFICATIONS_EMAIL_DIGEST = os.getenv('NOTIFICATIONS_EMAIL_DIGEST', False) == 'True'
+
+# сколько последних непросмотренных уведомлений пользователя хранится в Redis
+NOTIFICATIONS_UNREAD_CACHE_SIZE = int(os.getenv('NOTIFICATIONS_UNREAD_CACHE_SIZE', default=100))
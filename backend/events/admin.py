@@ -1,5 +1,7 @@
 from django.contrib import admin
 
+from users.admin import MentalStateDisplayMixin
+
 from .models import Category, Entry, Event, MeetingResult
 
 
@@ -28,6 +30,10 @@ class EventAdmin(admin.ModelAdmin):
 
 
 @admin.register(MeetingResult)
-class MeetingResultAdmin(admin.ModelAdmin):
+class MeetingResultAdmin(MentalStateDisplayMixin, admin.ModelAdmin):
     fields = ('date', 'organizer', 'employee', 'mental_state', 'comment')
-    list_display = ('date', 'organizer', 'employee', 'mental_state')
+    list_display = ('date', 'organizer', 'employee', 'mental_state_display')
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return queryset.select_related('organizer', 'employee')
@@ -1,10 +1,13 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.db.models import Q
 from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
-from metrics.models import BurnoutTracker
+from metrics.models import BurnoutRollup, BurnoutTracker
+from notifications.delivery import BROADCAST_GROUP, department_group_name
 from notifications.models import Notification
+from notifications.service import notification_service
 
 from ..models import Event, MeetingResult
 
@@ -20,13 +23,12 @@ def create_notification_for_event_for_all(sender, instance, created, **kwargs):
     для всех активных пользователей сервиса.
     """
     if created and instance.for_all:
-        Notification.objects.bulk_create([
-            Notification(
-                incident_type=Notification.IncidentType.EVENT,
-                incident_id=instance.id,
-                user=obj
-            ) for obj in User.objects.filter(is_active=True)
-        ])
+        notification_service.notify(
+            Notification.IncidentType.EVENT,
+            instance.id,
+            User.objects.filter(is_active=True).values_list('id', flat=True),
+            groups=[BROADCAST_GROUP]
+        )
 
 
 @receiver(post_delete, sender=Event)
@@ -53,15 +55,14 @@ def create_notification_for_event_by_departments(
     `departments`.
     """
     if action == 'post_add' and instance.for_all is False:
-        Notification.objects.bulk_create([
-            Notification(
-                incident_type=Notification.IncidentType.EVENT,
-                incident_id=instance.id,
-                user=obj
-            ) for obj in User.objects.filter(
+        notification_service.notify(
+            Notification.IncidentType.EVENT,
+            instance.id,
+            User.objects.filter(
                 Q(department__in=pk_set) & Q(is_active=True)
-            )
-        ])
+            ).values_list('id', flat=True),
+            groups=[department_group_name(pk) for pk in pk_set]
+        )
 
 
 @receiver(m2m_changed, sender=Event.employees.through)
@@ -76,29 +77,29 @@ def create_notification_for_event_by_employees(
     `departments`.
     """
     if action == 'post_add' and instance.for_all is False:
-        Notification.objects.bulk_create([
-            Notification(
-                incident_type=Notification.IncidentType.EVENT,
-                incident_id=instance.id,
-                user=obj
-            ) for obj in User.objects.filter(
+        notification_service.notify(
+            Notification.IncidentType.EVENT,
+            instance.id,
+            User.objects.filter(
                 Q(id__in=pk_set) & Q(is_active=True)
-            )
-        ])
+            ).values_list('id', flat=True)
+        )
 
 
 @receiver(post_save, sender=MeetingResult)
 def add_mental_state_to_tracker(sender, instance, created, **kwargs):
     """Вызывается после сохранения объекта `MeetingResult`.
 
-    По итогам проведенной встречи обновляет трекер выгорания.
+    По итогам проведенной встречи обновляет трекер выгорания и его сводку.
     """
     if created:
-        BurnoutTracker.objects.create(
-            employee=instance.employee,
-            mental_state=instance.mental_state,
-            date=instance.date
-        )
+        with transaction.atomic():
+            tracker = BurnoutTracker.objects.create(
+                employee=instance.employee,
+                mental_state=instance.mental_state,
+                date=instance.date
+            )
+            BurnoutRollup.objects.add_tracker(tracker)
         # TODO временный костыль, подробности в пр
         User.objects.filter(
             id=instance.employee.id
@@ -2,9 +2,12 @@ from django.contrib import admin
 from django.core.exceptions import ValidationError
 from django.forms.models import BaseInlineFormSet
 
+from users.admin import MentalStateDisplayMixin
+
 from .models import (ActivityRate, ActivityTracker, ActivityType,
-                     BurnoutTracker, CompletedSurvey, Condition, LifeDirection,
-                     Question, Survey, SurveyType, UserLifeBalance, Variant)
+                     BurnoutRollup, BurnoutTracker, CompletedSurvey, Condition,
+                     LifeDirection, Question, Survey, SurveyType,
+                     UserLifeBalance, Variant)
 
 
 @admin.register(Condition)
@@ -30,8 +33,28 @@ class ConditionAdmin(admin.ModelAdmin):
 
 
 @admin.register(BurnoutTracker)
-class BurnoutTrackerAdmin(admin.ModelAdmin):
-    list_display = ('date', 'employee', 'mental_state')
+class BurnoutTrackerAdmin(MentalStateDisplayMixin, admin.ModelAdmin):
+    list_display = ('date', 'employee', 'mental_state_display')
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return queryset.select_related('employee',)
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(BurnoutRollup)
+class BurnoutRollupAdmin(admin.ModelAdmin):
+    list_display = ('date', 'department', 'position', 'level', 'count')
+    list_filter = ('level', 'date')
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return queryset.select_related('department', 'position')
 
     def has_add_permission(self, request, obj=None):
         return False
@@ -137,8 +160,10 @@ class VariantAdmin(admin.ModelAdmin):
 
 
 @admin.register(CompletedSurvey)
-class CompletedSurvey(admin.ModelAdmin):
-    list_display = ('employee', 'survey', 'mental_state', 'completion_date',)
+class CompletedSurvey(MentalStateDisplayMixin, admin.ModelAdmin):
+    list_display = (
+        'employee', 'survey', 'mental_state_display', 'completion_date',
+    )
     list_filter = ('survey',)
     search_fields = ('employee', 'survey',)
     ordering = ('-completion_date', 'employee', 'survey',)
@@ -158,7 +183,7 @@ class CompletedSurvey(admin.ModelAdmin):
 
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
-        return queryset.select_related('employee', 'survey', 'mental_state')
+        return queryset.select_related('employee', 'survey')
 
     def has_add_permission(self, request, obj=None):
         return False
@@ -0,0 +1,163 @@
+from datetime import date, datetime
+
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+
+class BurnoutAggregation:
+    """
+    Помесячный процент выгорания сотрудников.
+
+    Весь ряд считается одним сгруппированным запросом: записи трекера
+    усекаются до месяца (`TruncMonth`), а количество записей каждого уровня
+    считается условной агрегацией.
+
+    Args:
+        year (int, optional): календарный год. По умолчанию текущий.
+        months (int, optional): скользящее окно из указанного количества
+            месяцев, заканчивающееся текущим месяцем. Если передано,
+            параметр `year` игнорируется.
+        department (int, optional): отдел сотрудников.
+        position (int, optional): должность сотрудников.
+    """
+
+    MONTH_NAMES = {
+        1: 'янв',
+        2: 'фев',
+        3: 'март',
+        4: 'апр',
+        5: 'май',
+        6: 'июнь',
+        7: 'июль',
+        8: 'авг',
+        9: 'сент',
+        10: 'окт',
+        11: 'ноя',
+        12: 'дек',
+    }
+    LEVEL_PERCENTAGE = {
+        1: 0,
+        2: 50,
+        3: 100,
+    }
+
+    date_field = 'date'
+    level_field = 'mental_state__level'
+    department_field = 'employee__department'
+    position_field = 'employee__position'
+
+    def __init__(
+        self,
+        year: int = None,
+        months: int = None,
+        department: int = None,
+        position: int = None
+    ):
+        self.department = department
+        self.position = position
+        self.months = self.get_months(year, months)
+
+    @staticmethod
+    def shift_month(month: date, delta: int) -> date:
+        index = month.year * 12 + month.month - 1 + delta
+        return date(index // 12, index % 12 + 1, 1)
+
+    def get_months(self, year: int = None, months: int = None) -> list:
+        """Возвращает первые числа месяцев, входящих в период."""
+        current_month = timezone.localdate().replace(day=1)
+
+        if months:
+            start = self.shift_month(current_month, 1 - months)
+        else:
+            start = date(year or current_month.year, 1, 1)
+            months = 12
+
+        return [self.shift_month(start, delta) for delta in range(months)]
+
+    def get_bound(self, month: date):
+        """Граница периода в формате поля `date_field`."""
+        return timezone.make_aware(datetime(month.year, month.month, 1))
+
+    def get_count(self, level: int = None):
+        if level is None:
+            return Count('id')
+        return Count('id', filter=Q(**{self.level_field: level}))
+
+    def filter_queryset(self, queryset):
+        start = self.months[0]
+        end = self.shift_month(self.months[-1], 1)
+        filters = {
+            f'{self.date_field}__gte': self.get_bound(start),
+            f'{self.date_field}__lt': self.get_bound(end),
+        }
+
+        if self.department:
+            filters[self.department_field] = self.department
+        if self.position:
+            filters[self.position_field] = self.position
+
+        return queryset.filter(**filters)
+
+    def aggregate(self, queryset) -> dict:
+        """Возвращает количество записей по уровням для каждого месяца."""
+        counts = {
+            f'level_{level}': self.get_count(level)
+            for level in self.LEVEL_PERCENTAGE
+        }
+        rows = (
+            self.filter_queryset(queryset)
+            .order_by()
+            .annotate(month=TruncMonth(self.date_field))
+            .values('month')
+            .annotate(total=self.get_count(), **counts)
+        )
+
+        result = {}
+        for row in rows:
+            month = row.pop('month')
+            if isinstance(month, datetime):
+                month = timezone.localtime(month).date()
+            result[month] = row
+        return result
+
+    def get_data(self, queryset) -> list:
+        """Данные в формате `MonthlyBurnoutSerializer`."""
+        aggregated = self.aggregate(queryset)
+        serialized_data = []
+
+        for month in self.months:
+            row = aggregated.get(month)
+            burnout_percentage = 0.0
+            if row and row['total']:
+                burnout_percentage = sum(
+                    percentage * (row[f'level_{level}'] or 0)
+                    for level, percentage in self.LEVEL_PERCENTAGE.items()
+                ) / row['total']
+            serialized_data.append({
+                'month': self.MONTH_NAMES[month.month],
+                'percentage': burnout_percentage
+            })
+
+        return serialized_data
+
+
+class BurnoutRollupAggregation(BurnoutAggregation):
+    """
+    Помесячный процент выгорания по сводке `BurnoutRollup`.
+
+    Объем данных зависит от количества дней, отделов и должностей,
+    а не от количества записей трекера.
+    """
+
+    level_field = 'level'
+    department_field = 'department'
+    position_field = 'position'
+
+    def get_bound(self, month: date):
+        return month
+
+    def get_count(self, level: int = None):
+        if level is None:
+            return Sum('count')
+        return Sum('count', filter=Q(**{self.level_field: level}))
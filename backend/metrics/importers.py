@@ -0,0 +1,364 @@
+import codecs
+import csv
+import json
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from users.registry import mental_states
+
+from .models import (BurnoutRollup, BurnoutTracker, CompletedSurvey, Survey,
+                     SurveyAvailability)
+from .result_calcs import evaluate_results, scoring_plans
+from .validators import validate_survey_results
+
+User = get_user_model()
+
+
+class CompletedSurveyImporter:
+    """
+    Массовый импорт результатов опросов, проведенных вне сервиса.
+
+    Строки обрабатываются пачками: для каждой пачки сотрудники выбираются
+    одним запросом, ответы проверяются по закэшированной схеме опроса и
+    рассчитываются в памяти, а результаты, записи трекера выгорания и
+    состояния сотрудников сохраняются массовыми запросами в одной
+    транзакции. Сигналы `CompletedSurvey` при этом не вызываются.
+
+    Проверка на повторное прохождение не выполняется: импортируются
+    уже состоявшиеся прохождения с указанной датой.
+
+    Формат JSON Lines - по одному объекту на строку:
+    `{"employee": 1, "survey": 2, "completion_date": "2023-06-01",
+    "results": [{"question_id": 1, "variant_value": 0}, ...]}`.
+
+    Формат CSV - колонки `employee`, `survey`, `completion_date`,
+    остальные колонки - id вопросов со значениями ответов.
+
+    Сотрудник указывается id или email, дата прохождения необязательна.
+
+    Args:
+        chunk_size (int, optional): количество строк в одной транзакции.
+    """
+
+    FORMATS = ('jsonl', 'csv')
+    ENCODING = 'utf-8-sig'
+    BASE_COLUMNS = ('employee', 'survey', 'completion_date')
+
+    def __init__(self, chunk_size: int = 1000):
+        self.chunk_size = chunk_size
+        self.created = 0
+        self.errors = []
+        self._surveys = {}
+
+    @classmethod
+    def detect_format(cls, filename: str) -> str:
+        """Определяет формат файла по расширению."""
+        extension = filename.rsplit('.', 1)[-1].lower()
+        if extension in ('jsonl', 'ndjson', 'json'):
+            return 'jsonl'
+        if extension == 'csv':
+            return 'csv'
+        return None
+
+    @classmethod
+    def validate_encoding(cls, file):
+        """
+        Проверяет кодировку файла, читая его по частям.
+
+        Raises:
+            ValidationError: файл не в кодировке UTF-8.
+        """
+        try:
+            for _ in codecs.iterdecode(file.chunks(), cls.ENCODING):
+                pass
+        except UnicodeDecodeError:
+            raise ValidationError('Файл должен быть в кодировке UTF-8.')
+        finally:
+            file.seek(0)
+
+    @classmethod
+    def decode(cls, file):
+        """Итератор строк файла."""
+        return codecs.iterdecode(file, cls.ENCODING)
+
+    def parse_jsonl(self, lines):
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_number, None, ['Строка не является JSON.']
+                continue
+            if not isinstance(row, dict):
+                yield line_number, None, ['Строка должна быть объектом.']
+                continue
+            yield line_number, row, None
+
+    def parse_csv(self, lines):
+        reader = csv.DictReader(lines)
+        question_columns = [
+            column for column in reader.fieldnames or ()
+            if column not in self.BASE_COLUMNS
+        ]
+        # первая строка файла - заголовок
+        for line_number, record in enumerate(reader, start=2):
+            try:
+                results = [
+                    {
+                        'question_id': int(column),
+                        'variant_value': int(record[column]),
+                    }
+                    for column in question_columns
+                    if record[column] not in (None, '')
+                ]
+            except ValueError:
+                yield line_number, None, [
+                    'id вопросов и значения ответов должны быть целыми '
+                    'числами.'
+                ]
+                continue
+            row = {
+                column: record.get(column) for column in self.BASE_COLUMNS
+            }
+            row['results'] = results
+            yield line_number, row, None
+
+    @staticmethod
+    def clean_date(value) -> date:
+        if value in (None, ''):
+            return date.today()
+        try:
+            completion_date = date.fromisoformat(str(value))
+        except ValueError:
+            raise ValidationError(
+                'Дата прохождения должна быть в формате ГГГГ-ММ-ДД.'
+            )
+        if completion_date > date.today():
+            raise ValidationError('Дата прохождения не может быть в будущем.')
+        return completion_date
+
+    def clean_row(self, row: dict) -> dict:
+        """Приводит типы полей строки, не обращаясь к БД."""
+        errors = []
+        cleaned = {}
+
+        employee = row.get('employee')
+        if isinstance(employee, str) and not employee.isdigit():
+            cleaned['employee'] = employee.strip().lower()
+        else:
+            try:
+                cleaned['employee'] = int(employee)
+            except (TypeError, ValueError):
+                errors.append('Не указан сотрудник.')
+
+        try:
+            cleaned['survey'] = int(row.get('survey'))
+        except (TypeError, ValueError):
+            errors.append('Не указан опрос.')
+
+        try:
+            cleaned['completion_date'] = self.clean_date(
+                row.get('completion_date')
+            )
+        except ValidationError as error:
+            errors.extend(error.messages)
+
+        results = row.get('results')
+        if not isinstance(results, list) or not all(
+            isinstance(item, dict)
+            and 'question_id' in item and 'variant_value' in item
+            for item in results
+        ):
+            errors.append('Ответы должны быть списком объектов с полями '
+                          'question_id и variant_value.')
+        cleaned['results'] = results
+
+        if errors:
+            raise ValidationError(errors)
+        return cleaned
+
+    def get_employees(self, keys) -> dict:
+        ids = [key for key in keys if isinstance(key, int)]
+        emails = [key for key in keys if isinstance(key, str)]
+        employees = {}
+        queryset = (
+            User.objects
+            .filter(Q(id__in=ids) | Q(email__in=emails))
+            .only('id', 'email', 'department', 'position', 'mental_state')
+        )
+        for employee in queryset:
+            employees[employee.id] = employee
+            employees[employee.email] = employee
+        return employees
+
+    def get_surveys(self, ids) -> dict:
+        missing = set(ids) - set(self._surveys)
+        if missing:
+            self._surveys.update(
+                (survey.id, survey) for survey in
+                Survey.objects.filter(id__in=missing).only('id', 'frequency')
+            )
+        return self._surveys
+
+    def score_row(self, row: dict, employees: dict, surveys: dict):
+        """Проверяет и рассчитывает одну строку, возвращает объект опроса."""
+        employee = employees.get(row['employee'])
+        if employee is None:
+            raise ValidationError('Сотрудник не найден.')
+        survey = surveys.get(row['survey'])
+        if survey is None:
+            raise ValidationError('Опрос не найден.')
+
+        validate_survey_results(survey.id, row['results'])
+        scored = evaluate_results(
+            survey.id, row['results'], scoring_plans.get(survey.id)
+        )
+        if scored is None:
+            raise ValidationError(
+                'Для данного типа опроса расчет результатов не поддерживается.'
+            )
+        level, summary = scored
+        mental_state = mental_states.get(level)
+        if mental_state is None:
+            raise ValidationError(f'Не найдено состояние уровня {level}.')
+
+        next_attempt_date = row['completion_date']
+        if survey.frequency:
+            next_attempt_date += timedelta(days=survey.frequency)
+
+        return CompletedSurvey(
+            employee=employee,
+            survey=survey,
+            mental_state=mental_state,
+            summary=summary,
+            results=row['results'],
+            completion_date=row['completion_date'],
+            next_attempt_date=next_attempt_date,
+            status=CompletedSurvey.Status.DONE,
+        )
+
+    def get_employees_to_update(self, objs) -> list:
+        """Сотрудники, для которых импортированный результат самый свежий."""
+        latest = {}
+        for obj in objs:
+            current = latest.get(obj.employee_id)
+            if (
+                current is None
+                or obj.completion_date >= current.completion_date
+            ):
+                latest[obj.employee_id] = obj
+
+        last_tracked = dict(
+            BurnoutTracker.objects
+            .filter(employee_id__in=latest)
+            .values('employee_id')
+            .annotate(last=Max('date'))
+            .values_list('employee_id', 'last')
+        )
+        employees = []
+        for employee_id, obj in latest.items():
+            tracked = last_tracked.get(employee_id)
+            if tracked and timezone.localtime(tracked).date() > (
+                obj.completion_date
+            ):
+                continue
+            obj.employee.mental_state = obj.mental_state
+            employees.append(obj.employee)
+        return employees
+
+    def save_chunk(self, objs: list):
+        with transaction.atomic():
+            employees = self.get_employees_to_update(objs)
+            CompletedSurvey.objects.bulk_create(objs)
+
+            trackers = []
+            rollup = Counter()
+            for obj in objs:
+                trackers.append(BurnoutTracker(
+                    employee=obj.employee,
+                    mental_state=obj.mental_state,
+                    date=timezone.make_aware(
+                        datetime.combine(obj.completion_date, time.min)
+                    ),
+                    completed_survey=obj,
+                ))
+                rollup[(
+                    obj.completion_date,
+                    obj.employee.department_id,
+                    obj.employee.position_id,
+                    obj.mental_state.level,
+                )] += 1
+            BurnoutTracker.objects.bulk_create(trackers)
+
+            for key, count in rollup.items():
+                BurnoutRollup.objects.add(*key, count=count)
+
+            next_dates = {}
+            for obj in objs:
+                key = (obj.employee_id, obj.survey_id)
+                next_dates[key] = max(
+                    next_dates.get(key, obj.next_attempt_date),
+                    obj.next_attempt_date
+                )
+            for (user_id, survey_id), next_date in next_dates.items():
+                SurveyAvailability.objects.mark_completed(
+                    user_id, survey_id, next_date
+                )
+
+            User.objects.bulk_update(employees, ['mental_state'])
+
+        self.created += len(objs)
+
+    def import_chunk(self, chunk: list):
+        rows = []
+        for line_number, row in chunk:
+            try:
+                rows.append((line_number, self.clean_row(row)))
+            except ValidationError as error:
+                self.add_error(line_number, error.messages)
+
+        employees = self.get_employees({row['employee'] for _, row in rows})
+        surveys = self.get_surveys({row['survey'] for _, row in rows})
+
+        objs = []
+        for line_number, row in rows:
+            try:
+                objs.append(self.score_row(row, employees, surveys))
+            except ValidationError as error:
+                self.add_error(line_number, error.messages)
+
+        if objs:
+            self.save_chunk(objs)
+
+    def add_error(self, line_number: int, messages: list):
+        self.errors.append({'row': line_number, 'errors': messages})
+
+    def run(self, lines, file_format: str) -> dict:
+        """
+        Импортирует результаты из итератора строк файла.
+
+        Returns:
+            dict: количество созданных результатов и ошибки по строкам.
+        """
+        parser = self.parse_csv if file_format == 'csv' else self.parse_jsonl
+        chunk = []
+        for line_number, row, errors in parser(lines):
+            if errors:
+                self.add_error(line_number, errors)
+                continue
+            chunk.append((line_number, row))
+            if len(chunk) >= self.chunk_size:
+                self.import_chunk(chunk)
+                chunk = []
+        if chunk:
+            self.import_chunk(chunk)
+
+        self.errors.sort(key=lambda error: error['row'])
+        return {'created': self.created, 'errors': self.errors}
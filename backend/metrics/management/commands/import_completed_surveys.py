@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from metrics.importers import CompletedSurveyImporter
+
+
+class Command(BaseCommand):
+    help = 'Импортирует результаты опросов из файла JSON Lines или CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу с результатами.')
+        parser.add_argument(
+            '--format',
+            choices=CompletedSurveyImporter.FORMATS,
+            help='Формат файла, по умолчанию определяется по расширению.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Количество строк, сохраняемых в одной транзакции.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = (
+            options['format'] or CompletedSurveyImporter.detect_format(path)
+        )
+        if not file_format:
+            raise CommandError('Не удалось определить формат файла.')
+
+        importer = CompletedSurveyImporter(chunk_size=options['chunk_size'])
+        with open(path, encoding='utf-8-sig', newline='') as file:
+            result = importer.run(file, file_format)
+
+        for error in result['errors']:
+            self.stderr.write(
+                f'Строка {error["row"]}: {" ".join(error["errors"])}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано: {result["created"]}, '
+            f'ошибок: {len(result["errors"])}.'
+        ))
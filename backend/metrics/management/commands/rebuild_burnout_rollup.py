@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from metrics.models import BurnoutRollup
+
+
+class Command(BaseCommand):
+    help = 'Полностью пересчитывает сводку трекера выгорания.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество записей сводки в одном INSERT.'
+        )
+
+    def handle(self, *args, **options):
+        count = BurnoutRollup.objects.rebuild(
+            batch_size=options['batch_size']
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Сводка пересчитана, записей: {count}.')
+        )
@@ -0,0 +1,203 @@
+import time
+from multiprocessing import Pool
+
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from metrics.models import BurnoutRollup, BurnoutTracker, CompletedSurvey
+from metrics.result_calcs import build_scoring_plan, evaluate_results
+from users.registry import mental_states
+
+# планы расчета, доступные в дочерних процессах
+_worker_plans = {}
+
+
+def init_worker(plans: dict):
+    _worker_plans.clear()
+    _worker_plans.update(plans)
+
+
+def evaluate_row(row: tuple) -> tuple:
+    """Рассчитывает результаты одного опроса в дочернем процессе."""
+    pk, survey_id, results = row
+    plan = _worker_plans.get(survey_id)
+    if plan is None:
+        return pk, None
+    try:
+        return pk, evaluate_results(survey_id, results, plan)
+    except (KeyError, TypeError, ValueError, ZeroDivisionError):
+        return pk, None
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает результаты пройденных опросов текущими '
+        'калькуляторами и границами опросов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--from-id',
+            type=int,
+            help='Минимальный id пройденного опроса.'
+        )
+        parser.add_argument(
+            '--to-id',
+            type=int,
+            help='Максимальный id пройденного опроса.'
+        )
+        parser.add_argument(
+            '--survey',
+            type=int,
+            action='append',
+            help='Пересчитать только указанные опросы (можно повторять).'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Количество опросов, обрабатываемых за одну итерацию.'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Количество процессов для расчета.'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только посчитать изменения, не сохраняя их.'
+        )
+        parser.add_argument(
+            '--rebuild-tracker',
+            action='store_true',
+            help=(
+                'Обновить состояние в связанных записях трекера выгорания '
+                'и пересчитать его сводку.'
+            )
+        )
+
+    def get_queryset(self, options):
+        queryset = CompletedSurvey.objects.filter(
+            status=CompletedSurvey.Status.DONE
+        )
+        if options['from_id'] is not None:
+            queryset = queryset.filter(id__gte=options['from_id'])
+        if options['to_id'] is not None:
+            queryset = queryset.filter(id__lte=options['to_id'])
+        if options['survey']:
+            queryset = queryset.filter(survey_id__in=options['survey'])
+        return queryset.order_by('id')
+
+    def iter_batches(self, queryset, batch_size):
+        """Постранично выбирает опросы по id, без OFFSET."""
+        last_id = None
+        while True:
+            batch = queryset
+            if last_id is not None:
+                batch = batch.filter(id__gt=last_id)
+            rows = list(
+                batch.values_list(
+                    'id', 'survey_id', 'results', 'mental_state_id', 'summary'
+                )[:batch_size]
+            )
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield rows
+
+    def get_changes(self, rows, results):
+        """Возвращает объекты с изменившимися результатами."""
+        current = {row[0]: (row[3], row[4]) for row in rows}
+        changes = []
+        for pk, result in results:
+            if result is None:
+                continue
+            level, summary = result
+            mental_state = mental_states.get(level)
+            if mental_state is None:
+                continue
+            mental_state_id, old_summary = current[pk]
+            if summary is None:
+                summary = old_summary
+            if (mental_state.pk, summary) == (mental_state_id, old_summary):
+                continue
+            changes.append(CompletedSurvey(
+                id=pk, mental_state_id=mental_state.pk, summary=summary
+            ))
+        return changes
+
+    def save_changes(self, changes, rebuild_tracker):
+        with transaction.atomic():
+            CompletedSurvey.objects.bulk_update(
+                changes, ['mental_state', 'summary']
+            )
+            if not rebuild_tracker:
+                return
+            by_state = {}
+            for obj in changes:
+                by_state.setdefault(obj.mental_state_id, []).append(obj.id)
+            for mental_state_id, ids in by_state.items():
+                BurnoutTracker.objects.filter(
+                    completed_survey_id__in=ids
+                ).update(mental_state_id=mental_state_id)
+
+    def handle(self, *args, **options):
+        queryset = self.get_queryset(options)
+        total = queryset.count()
+        survey_ids = set(
+            queryset.order_by().values_list('survey_id', flat=True).distinct()
+        )
+        # планы строятся заново, минуя кэш, чтобы учесть последние правки
+        plans = {
+            survey_id: build_scoring_plan(survey_id)
+            for survey_id in survey_ids
+        }
+        dry_run = options['dry_run']
+        rebuild_tracker = options['rebuild_tracker'] and not dry_run
+        workers = max(options['workers'], 1)
+
+        pool = None
+        if workers > 1:
+            # дочерние процессы не должны наследовать открытые соединения
+            connections.close_all()
+            pool = Pool(workers, initializer=init_worker, initargs=(plans,))
+        else:
+            init_worker(plans)
+
+        processed = changed = 0
+        started = time.monotonic()
+        try:
+            for rows in self.iter_batches(queryset, options['batch_size']):
+                tasks = [row[:3] for row in rows]
+                if pool is not None:
+                    chunksize = max(len(tasks) // (workers * 4), 1)
+                    results = pool.map(evaluate_row, tasks, chunksize)
+                else:
+                    results = map(evaluate_row, tasks)
+
+                changes = self.get_changes(rows, results)
+                if changes and not dry_run:
+                    self.save_changes(changes, rebuild_tracker)
+
+                processed += len(rows)
+                changed += len(changes)
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f'{processed}/{total}, изменено: {changed}, '
+                    f'{processed / max(elapsed, 1e-6):.0f} опросов/с'
+                )
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        if rebuild_tracker and changed:
+            BurnoutRollup.objects.rebuild()
+
+        if dry_run:
+            message = f'Пробный запуск, изменились бы результаты: {changed}.'
+        else:
+            message = f'Пересчитано: {processed}, изменено: {changed}.'
+        self.stdout.write(self.style.SUCCESS(message))
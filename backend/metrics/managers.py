@@ -0,0 +1,199 @@
+from datetime import datetime
+
+from django.db import IntegrityError, connections, models, transaction
+from django.db.models import Count, F, Max, Q, Value
+from django.db.models.functions import Coalesce, Greatest, TruncDate
+from django.utils import timezone
+
+
+class BurnoutRollupManager(models.Manager):
+
+    @staticmethod
+    def get_day(value):
+        """Приводит дату/время записи трекера к локальной дате."""
+        if isinstance(value, datetime):
+            if timezone.is_aware(value):
+                value = timezone.localtime(value)
+            return value.date()
+        return value
+
+    def add(self, day, department_id, position_id, level, count=1):
+        """Атомарно увеличивает счетчик записей за день."""
+        lookup = {
+            'date': day,
+            'department_id': department_id,
+            'position_id': position_id,
+            'level': level,
+        }
+        if self.filter(**lookup).update(count=F('count') + count):
+            return
+
+        try:
+            with transaction.atomic():
+                self.create(count=count, **lookup)
+        except IntegrityError:
+            # запись успели создать в параллельном запросе
+            self.filter(**lookup).update(count=F('count') + count)
+
+    def add_tracker(self, tracker):
+        """Учитывает в сводке новую запись `BurnoutTracker`."""
+        self.add(
+            self.get_day(tracker.date),
+            tracker.employee.department_id,
+            tracker.employee.position_id,
+            tracker.mental_state.level,
+        )
+
+    def rebuild(self, batch_size=1000):
+        """
+        Пересчитывает сводку по всем записям трекера выгорания.
+
+        Пересчет выполняется в одной транзакции под блокировкой таблицы
+        сводки. Записи трекера создаются в одной транзакции с `add`,
+        поэтому добавленные во время пересчета записи либо уже учтены
+        в выборке, либо ждут снятия блокировки и учитываются после нее.
+        """
+        tracker_model = self.model._meta.apps.get_model(
+            'metrics', 'BurnoutTracker'
+        )
+        connection = connections[self.db]
+        with transaction.atomic(using=self.db):
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f'LOCK TABLE "{self.model._meta.db_table}" '
+                        f'IN EXCLUSIVE MODE'
+                    )
+            self.all().delete()
+            rows = (
+                tracker_model.objects
+                .order_by()
+                .annotate(day=TruncDate('date'))
+                .values(
+                    'day',
+                    'employee__department',
+                    'employee__position',
+                    'mental_state__level',
+                )
+                .annotate(count=Count('id'))
+            )
+            objs = self.bulk_create(
+                [
+                    self.model(
+                        date=row['day'],
+                        department_id=row['employee__department'],
+                        position_id=row['employee__position'],
+                        level=row['mental_state__level'],
+                        count=row['count'],
+                    ) for row in rows.iterator()
+                ],
+                batch_size=batch_size
+            )
+
+        return len(objs)
+
+
+class SurveyAvailabilityManager(models.Manager):
+
+    def get_related_model(self, name):
+        return self.model._meta.get_field(name).related_model
+
+    def get_survey_audience(self, survey) -> set:
+        """Пользователи, которым доступен опрос."""
+        users = self.get_related_model('user').objects.all()
+        if not survey.for_all:
+            department_ids = list(
+                survey.department.values_list('id', flat=True)
+            )
+            # как и в выборке по отделу пользователя, опросы без отделов
+            # доступны пользователям без отдела
+            if department_ids:
+                users = users.filter(department__in=department_ids)
+            else:
+                users = users.filter(department__isnull=True)
+
+        user_ids = set(users.values_list('id', flat=True))
+        if survey.author_id:
+            user_ids.add(survey.author_id)
+        return user_ids
+
+    def get_user_surveys(self, user) -> set:
+        """Опросы, доступные пользователю."""
+        return set(
+            self.get_related_model('survey').objects
+            .filter(
+                Q(author=user)
+                | Q(for_all=True)
+                | Q(department=user.department_id)
+            )
+            .values_list('id', flat=True)
+        )
+
+    def create_pairs(self, pairs, batch_size=1000):
+        """Создает записи для пар (пользователь, опрос)."""
+        if not pairs:
+            return
+        completed_survey_model = self.model._meta.apps.get_model(
+            'metrics', 'CompletedSurvey'
+        )
+        next_dates = {
+            (row['employee_id'], row['survey_id']): row['next_date']
+            for row in (
+                completed_survey_model.objects
+                .filter(
+                    employee_id__in={user_id for user_id, _ in pairs},
+                    survey_id__in={survey_id for _, survey_id in pairs},
+                )
+                .order_by()
+                .values('employee_id', 'survey_id')
+                .annotate(next_date=Max('next_attempt_date'))
+            )
+        }
+        self.bulk_create(
+            [
+                self.model(
+                    user_id=user_id,
+                    survey_id=survey_id,
+                    next_available_date=next_dates.get((user_id, survey_id)),
+                ) for user_id, survey_id in pairs
+            ],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+
+    def sync_survey(self, survey):
+        """Приводит записи опроса в соответствие с его аудиторией."""
+        audience = self.get_survey_audience(survey)
+        existing = set(
+            self.filter(survey=survey).values_list('user_id', flat=True)
+        )
+        with transaction.atomic():
+            stale = existing - audience
+            if stale:
+                self.filter(survey=survey, user_id__in=stale).delete()
+            self.create_pairs(
+                [(user_id, survey.id) for user_id in audience - existing]
+            )
+
+    def sync_user(self, user):
+        """Приводит записи пользователя в соответствие с его отделом."""
+        surveys = self.get_user_surveys(user)
+        existing = set(
+            self.filter(user=user).values_list('survey_id', flat=True)
+        )
+        with transaction.atomic():
+            stale = existing - surveys
+            if stale:
+                self.filter(user=user, survey_id__in=stale).delete()
+            self.create_pairs(
+                [(user.id, survey_id) for survey_id in surveys - existing]
+            )
+
+    def mark_completed(self, user_id, survey_id, next_date):
+        """Откладывает доступность опроса после его прохождения."""
+        self.filter(user_id=user_id, survey_id=survey_id).update(
+            next_available_date=Greatest(
+                Coalesce('next_available_date', Value(next_date)),
+                Value(next_date)
+            )
+        )
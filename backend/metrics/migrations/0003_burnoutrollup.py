@@ -0,0 +1,36 @@
+# Generated by Django 4.2.1 on 2026-10-18 19:30
+
+import django.db.models.deletion
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('metrics', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BurnoutRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(db_index=True, verbose_name='Дата')),
+                ('level', models.PositiveSmallIntegerField(choices=[(1, 'Норма'), (2, 'Плохо'), (3, 'Критический уровень')], verbose_name='Уровень состояния')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Количество записей')),
+                ('department', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='users.department', verbose_name='Отдел')),
+                ('position', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='users.position', verbose_name='Должность')),
+            ],
+            options={
+                'verbose_name': 'Сводка трекера выгорания',
+                'verbose_name_plural': 'Сводки трекера выгорания',
+                'ordering': ('-date',),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='burnoutrollup',
+            constraint=models.UniqueConstraint(models.F('date'), django.db.models.functions.comparison.Coalesce('department', 0), django.db.models.functions.comparison.Coalesce('position', 0), models.F('level'), name='burnout_rollup_uniqueness'),
+        ),
+    ]
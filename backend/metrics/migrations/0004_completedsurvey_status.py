@@ -0,0 +1,18 @@
+# Generated by Django 4.2.1 on 2026-10-18 19:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('metrics', '0003_burnoutrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='completedsurvey',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Ожидает расчета'), ('done', 'Рассчитан'), ('failed', 'Ошибка расчета')], default='done', max_length=16, verbose_name='Статус расчета результатов'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.1 on 2026-10-18 19:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('metrics', '0004_completedsurvey_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='burnouttracker',
+            name='completed_survey',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='burnout_track', to='metrics.completedsurvey', verbose_name='Результат опроса'),
+        ),
+    ]
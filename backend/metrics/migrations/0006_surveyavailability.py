@@ -0,0 +1,34 @@
+# Generated by Django 4.2.1 on 2026-10-18 19:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('metrics', '0005_burnouttracker_completed_survey'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SurveyAvailability',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('next_available_date', models.DateField(blank=True, db_index=True, null=True, verbose_name='Дата следующей попытки')),
+                ('survey', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availabilities', to='metrics.survey', verbose_name='Опрос')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='survey_availabilities', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Доступность опроса',
+                'verbose_name_plural': 'Доступность опросов',
+                'indexes': [models.Index(fields=['user', 'next_available_date'], name='survey_availability_user_date')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='surveyavailability',
+            constraint=models.UniqueConstraint(fields=('user', 'survey'), name='survey_availability_uniqueness'),
+        ),
+    ]
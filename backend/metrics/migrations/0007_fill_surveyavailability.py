@@ -0,0 +1,59 @@
+# Generated by Django 4.2.1 on 2026-10-18 19:40
+
+from django.db import migrations
+from django.db.models import Max
+
+
+def fill_survey_availability(apps, schema_editor):
+    Survey = apps.get_model('metrics', 'Survey')
+    CompletedSurvey = apps.get_model('metrics', 'CompletedSurvey')
+    SurveyAvailability = apps.get_model('metrics', 'SurveyAvailability')
+    User = apps.get_model('users', 'User')
+
+    next_dates = {
+        (row['employee_id'], row['survey_id']): row['next_date']
+        for row in (
+            CompletedSurvey.objects
+            .order_by()
+            .values('employee_id', 'survey_id')
+            .annotate(next_date=Max('next_attempt_date'))
+        )
+    }
+    all_users = list(User.objects.values_list('id', flat=True))
+
+    for survey in Survey.objects.prefetch_related('department'):
+        if survey.for_all:
+            user_ids = set(all_users)
+        else:
+            department_ids = [dep.id for dep in survey.department.all()]
+            users = User.objects.filter(department__isnull=True)
+            if department_ids:
+                users = User.objects.filter(department__in=department_ids)
+            user_ids = set(users.values_list('id', flat=True))
+        if survey.author_id:
+            user_ids.add(survey.author_id)
+
+        SurveyAvailability.objects.bulk_create(
+            [
+                SurveyAvailability(
+                    user_id=user_id,
+                    survey_id=survey.id,
+                    next_available_date=next_dates.get((user_id, survey.id)),
+                ) for user_id in user_ids
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('metrics', '0006_surveyavailability'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            fill_survey_availability, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.1 on 2026-10-18 20:15
+
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def fill_burnout_rollup(apps, schema_editor):
+    BurnoutTracker = apps.get_model('metrics', 'BurnoutTracker')
+    BurnoutRollup = apps.get_model('metrics', 'BurnoutRollup')
+
+    rows = (
+        BurnoutTracker.objects
+        .order_by()
+        .annotate(day=TruncDate('date'))
+        .values(
+            'day',
+            'employee__department',
+            'employee__position',
+            'mental_state__level',
+        )
+        .annotate(count=Count('id'))
+    )
+    BurnoutRollup.objects.all().delete()
+    BurnoutRollup.objects.bulk_create(
+        [
+            BurnoutRollup(
+                date=row['day'],
+                department_id=row['employee__department'],
+                position_id=row['employee__position'],
+                level=row['mental_state__level'],
+                count=row['count'],
+            ) for row in rows.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('metrics', '0007_fill_surveyavailability'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_burnout_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.1 on 2026-10-18 20:38
+
+from datetime import time
+
+from django.db import migrations
+from django.utils import timezone
+
+
+def link_completed_surveys(apps, schema_editor):
+    """
+    Связывает записи трекера с результатами опросов.
+
+    Записи по опросам создавались с датой прохождения, то есть с
+    полуночью. Записи сотрудника за день сопоставляются с его
+    результатами за тот же день в порядке создания.
+    """
+    BurnoutTracker = apps.get_model('metrics', 'BurnoutTracker')
+    CompletedSurvey = apps.get_model('metrics', 'CompletedSurvey')
+
+    trackers = {}
+    for tracker_id, employee_id, tracked in (
+        BurnoutTracker.objects
+        .filter(completed_survey__isnull=True)
+        .order_by('id')
+        .values_list('id', 'employee_id', 'date')
+        .iterator()
+    ):
+        tracked = timezone.localtime(tracked)
+        if tracked.time() == time.min:
+            trackers.setdefault(
+                (employee_id, tracked.date()), []
+            ).append(tracker_id)
+    if not trackers:
+        return
+
+    linked = set(
+        BurnoutTracker.objects
+        .filter(completed_survey__isnull=False)
+        .values_list('completed_survey_id', flat=True)
+    )
+    changes = []
+    for survey_id, employee_id, completion_date in (
+        CompletedSurvey.objects
+        .order_by('id')
+        .values_list('id', 'employee_id', 'completion_date')
+        .iterator()
+    ):
+        ids = trackers.get((employee_id, completion_date))
+        if ids and survey_id not in linked:
+            changes.append(BurnoutTracker(
+                id=ids.pop(0), completed_survey_id=survey_id
+            ))
+    BurnoutTracker.objects.bulk_update(
+        changes, ['completed_survey'], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('metrics', '0008_fill_burnoutrollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            link_completed_surveys, migrations.RunPython.noop
+        ),
+    ]
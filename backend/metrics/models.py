@@ -5,12 +5,15 @@ from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.core.validators import (MaxValueValidator, MinLengthValidator,
                                     MinValueValidator)
-from django.db import models
+from django.db import models, transaction
+from django.db.models import UniqueConstraint
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
-from users.models import Department, MentalState
+from users.models import Department, MentalState, Position
 
+from .managers import BurnoutRollupManager, SurveyAvailabilityManager
 from .validators import validate_results
 
 User = get_user_model()
@@ -71,6 +74,14 @@ class BurnoutTracker(models.Model):
         verbose_name='Дата/время обновления состояния',
         default=timezone.localtime
     )
+    completed_survey = models.ForeignKey(
+        'CompletedSurvey',
+        verbose_name='Результат опроса',
+        related_name='burnout_track',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL
+    )
 
     class Meta:
         verbose_name = 'Трекер выгорания'
@@ -78,6 +89,63 @@ class BurnoutTracker(models.Model):
         ordering = ('-date',)
 
 
+class BurnoutRollup(models.Model):
+    """Количество записей трекера выгорания за день в разрезе сотрудников.
+
+    Поддерживается инкрементально при создании записей `BurnoutTracker`,
+    полностью пересчитывается ежедневно задачей и командой
+    `rebuild_burnout_rollup`.
+    Отдел и должность фиксируются на момент добавления записи.
+    """
+
+    date = models.DateField(
+        verbose_name='Дата',
+        db_index=True
+    )
+    department = models.ForeignKey(
+        Department,
+        verbose_name='Отдел',
+        related_name='+',
+        null=True,
+        blank=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False
+    )
+    position = models.ForeignKey(
+        Position,
+        verbose_name='Должность',
+        related_name='+',
+        null=True,
+        blank=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False
+    )
+    level = models.PositiveSmallIntegerField(
+        verbose_name='Уровень состояния',
+        choices=MentalState.LEVELS
+    )
+    count = models.PositiveIntegerField(
+        verbose_name='Количество записей',
+        default=0
+    )
+
+    objects = BurnoutRollupManager()
+
+    class Meta:
+        verbose_name = 'Сводка трекера выгорания'
+        verbose_name_plural = 'Сводки трекера выгорания'
+        ordering = ('-date',)
+        constraints = [
+            UniqueConstraint(
+                'date',
+                Coalesce('department', 0),
+                Coalesce('position', 0),
+                'level',
+                name='burnout_rollup_uniqueness',
+            ),
+        ]
+
+
 class LifeDirection(models.Model):
     """Жизненное направление для колеса баланса."""
 
@@ -348,6 +416,11 @@ class Variant(models.Model):
 class CompletedSurvey(models.Model):
     """Модель связывающая сотрудников и их результаты прохождения опроса."""
 
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Ожидает расчета'
+        DONE = 'done', 'Рассчитан'
+        FAILED = 'failed', 'Ошибка расчета'
+
     employee = models.ForeignKey(
         User,
         verbose_name='сотрудник',
@@ -381,6 +454,12 @@ class CompletedSurvey(models.Model):
         verbose_name='дата следующей попытки',
         default=date.today,
     )
+    status = models.CharField(
+        verbose_name='Статус расчета результатов',
+        max_length=16,
+        choices=Status.choices,
+        default=Status.DONE
+    )
 
     class Meta:
         ordering = ('-id',)
@@ -391,25 +470,67 @@ class CompletedSurvey(models.Model):
         return (f'"{self.survey.title}" Пройден '
                 f'сотрудником {self.employee.get_full_name}')
 
-    def set_mental_state(self, result_in_persent):
-
-        level = 1
+    def add_to_burnout_tracker(self):
+        """Добавляет рассчитанное состояние в трекер выгорания."""
+        with transaction.atomic():
+            tracker = BurnoutTracker.objects.create(
+                employee=self.employee,
+                mental_state=self.mental_state,
+                date=self.completion_date,
+                completed_survey=self
+            )
+            BurnoutRollup.objects.add_tracker(tracker)
+
+
+class SurveyAvailability(models.Model):
+    """
+    Дата, с которой опрос доступен пользователю.
+
+    Запись существует для каждого пользователя из аудитории опроса и
+    поддерживается сигналами при прохождении опроса и изменении его
+    аудитории, поэтому список доступных опросов выбирается по индексу.
+    Пустая дата означает, что пользователь еще не проходил опрос.
+    """
+
+    user = models.ForeignKey(
+        User,
+        verbose_name='Пользователь',
+        on_delete=models.CASCADE,
+        related_name='survey_availabilities',
+    )
+    survey = models.ForeignKey(
+        Survey,
+        verbose_name='Опрос',
+        on_delete=models.CASCADE,
+        related_name='availabilities',
+    )
+    next_available_date = models.DateField(
+        verbose_name='Дата следующей попытки',
+        null=True,
+        blank=True,
+        db_index=True,
+    )
 
-        if self.survey.min_range is not None:
+    objects = SurveyAvailabilityManager()
 
-            if result_in_persent in range(self.survey.min_range):
-                level = 1
-            elif result_in_persent in range(
-                self.survey.min_range, self.survey.max_range
-            ):
-                level = 2
-            elif result_in_persent in range(self.survey.max_range, 101):
-                level = 3
+    class Meta:
+        verbose_name = 'Доступность опроса'
+        verbose_name_plural = 'Доступность опросов'
+        constraints = [
+            UniqueConstraint(
+                fields=('user', 'survey'),
+                name='survey_availability_uniqueness',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=('user', 'next_available_date'),
+                name='survey_availability_user_date',
+            ),
+        ]
 
-        mental_state = MentalState.objects.filter(level=level).first()
-        self.mental_state = mental_state
-        self.employee.mental_state = mental_state
-        self.employee.save()
+    def __str__(self):
+        return f'Опрос {self.survey_id} для пользователя {self.user_id}'
 
 
 class ActivityType(models.Model):
@@ -1,17 +1,35 @@
 from abc import ABC, abstractmethod
 from math import sqrt
+from types import SimpleNamespace
 
-from .models import MentalState, Question
+from spare_kits.cache import VersionedCache
+from users.registry import mental_states
+
+from .models import Question, Survey
 
 
 class BaseCalculate(ABC):
 
-    def __init__(self, instance: object):
+    def __init__(self, instance: object, plan: dict = None):
         self.instance = instance
+        self.plan = plan or scoring_plans.get(instance.survey_id)
         self.values = [i['variant_value'] for i in self.instance.results]
-        self.questions = Question.objects.filter(
-            id__in=[i['question_id'] for i in self.instance.results]
-        )
+
+    @classmethod
+    def compile_plan(cls, questions: dict) -> dict:
+        """
+        Подготавливает данные опроса, необходимые для расчета результатов.
+
+        Args:
+            questions (dict): ключи вопросов опроса по их id.
+
+        Returns:
+            dict: план расчета результатов опроса.
+        """
+        return {
+            'questions': questions,
+            'count': len(questions),
+        }
 
     @staticmethod
     def level_words(
@@ -42,8 +60,24 @@ class BaseCalculate(ABC):
 
         return words[level][endings - 1]
 
-    @abstractmethod
     def calculate(self):
+        """Записывает результаты в опрос и обновляет состояние сотрудника."""
+        level, summary = self.evaluate()
+        mental_state = mental_states.get(level)
+        self.instance.mental_state = mental_state
+        if summary is not None:
+            self.instance.summary = summary
+        self.instance.employee.mental_state = mental_state
+        self.instance.employee.save(update_fields=['mental_state'])
+
+    @abstractmethod
+    def evaluate(self) -> tuple:
+        """
+        Рассчитывает результаты только по плану и ответам, без запросов к БД.
+
+        Returns:
+            tuple: уровень состояния и сводка (или None).
+        """
         pass
 
 
@@ -57,12 +91,25 @@ class YesNoCalculate(BaseCalculate):
         BaseCalculate (_type_): _description_
     """
 
-    def calculate(self):
+    def evaluate(self):
 
         result_in_persent = (
-            self.values.count(1) / self.questions.count() * 100
+            self.values.count(1) / self.plan['count'] * 100
         )
-        self.instance.set_mental_state(result_in_persent)
+        min_range = self.plan['min_range']
+        max_range = self.plan['max_range']
+        level = 1
+
+        if min_range is not None:
+
+            if result_in_persent in range(min_range):
+                level = 1
+            elif result_in_persent in range(min_range, max_range):
+                level = 2
+            elif result_in_persent in range(max_range, 101):
+                level = 3
+
+        return level, None
 
 
 class MBICalculate(BaseCalculate):
@@ -73,33 +120,41 @@ class MBICalculate(BaseCalculate):
         BaseCalculate (_type_): _description_
     """
 
-    def calculate(self):
-
-        ee = self.questions.filter(key=1).values_list('id', flat=True)
-        ee_max = 6 * ee.count() + 6
-        ee_sum = 0
-
-        dp = self.questions.filter(key=2).values_list('id', flat=True)
-        dp_max = 6 * dp.count()
-        dp_sum = 0
+    # по методике 1 вариант инвертирован, ему даем ключ 4
+    INVERTED_KEY = 4
+
+    @classmethod
+    def compile_plan(cls, questions: dict) -> dict:
+        plan = super().compile_plan(questions)
+        keys = list(questions.values())
+        plan['max_scores'] = {
+            1: 6 * keys.count(1) + 6,
+            2: 6 * keys.count(2),
+            3: 6 * keys.count(3),
+        }
+        plan['inverted'] = frozenset(
+            question_id for question_id, key in questions.items()
+            if key == cls.INVERTED_KEY
+        )
+        return plan
 
-        pa = self.questions.filter(key=3).values_list('id', flat=True)
-        pa_max = 6 * pa.count()
-        pa_sum = 0
+    def evaluate(self):
 
-        # по методике 1 вариант инвертирован, ему даем ключ 4
-        inverted = self.questions.filter(key=4).values_list('id', flat=True)
+        questions = self.plan['questions']
+        ee_max, dp_max, pa_max = (
+            self.plan['max_scores'][key] for key in (1, 2, 3)
+        )
+        sums = {1: 0, 2: 0, 3: 0}
 
         for value in self.instance.results:
-            if value['question_id'] in inverted:
-                invert = 6 - value['variant_value']
-                ee_sum += invert
-            if value['question_id'] in ee:
-                ee_sum += value['variant_value']
-            if value['question_id'] in dp:
-                dp_sum += value['variant_value']
-            if value['question_id'] in pa:
-                pa_sum += value['variant_value']
+            if value['question_id'] in self.plan['inverted']:
+                sums[1] += 6 - value['variant_value']
+                continue
+            key = questions.get(value['question_id'])
+            if key in sums:
+                sums[key] += value['variant_value']
+
+        ee_sum, dp_sum, pa_sum = sums[1], sums[2], sums[3]
 
         index = sqrt(((ee_sum / ee_max)**2 + (dp_sum / dp_max)**2
                       + (1 - pa_sum / pa_max)**2) / 3)
@@ -128,11 +183,6 @@ class MBICalculate(BaseCalculate):
 
         level = max([ee_level, dp_level, pa_level])
 
-        mental_state = MentalState.objects.filter(level=level).first()
-        self.instance.mental_state = mental_state
-        self.instance.employee.mental_state = mental_state
-        self.instance.employee.save()
-
         graphs_colors = {
             1: 'green',
             2: 'yellow',
@@ -183,4 +233,63 @@ class MBICalculate(BaseCalculate):
                 },
             ]
         }
-        self.instance.summary = summary
+        return level, summary
+
+
+SURVEY_CALCULATORS = {
+    'yn': YesNoCalculate,
+    'mbi': MBICalculate,
+}
+
+
+def build_scoring_plan(survey_id: int) -> dict:
+    """Собирает план расчета результатов опроса по данным из БД."""
+    survey_type, min_range, max_range = (
+        Survey.objects
+        .filter(id=survey_id)
+        .values_list('type__slug', 'min_range', 'max_range')
+        .first()
+    ) or (None, None, None)
+    questions = dict(
+        Question.objects
+        .filter(survey_id=survey_id)
+        .values_list('id', 'key')
+    )
+    calculator = SURVEY_CALCULATORS.get(survey_type, BaseCalculate)
+    plan = calculator.compile_plan(questions)
+    plan.update({
+        'type': survey_type,
+        'min_range': min_range,
+        'max_range': max_range,
+    })
+    return plan
+
+
+scoring_plans = VersionedCache('scoring_plan', build_scoring_plan)
+
+
+def calculate_results(instance: object, plan: dict = None):
+    """Рассчитывает результаты прохождения опроса калькулятором его типа."""
+    plan = plan or scoring_plans.get(instance.survey_id)
+
+    if plan['type'] in SURVEY_CALCULATORS:
+        handler_class = SURVEY_CALCULATORS[plan['type']]
+        handler = handler_class(instance, plan)
+        handler.calculate()
+
+
+def evaluate_results(survey_id: int, results: list, plan: dict):
+    """
+    Рассчитывает результаты опроса без обращений к БД.
+
+    Используется при массовом пересчете, в том числе в дочерних процессах.
+
+    Returns:
+        tuple: уровень состояния и сводка или None, если тип опроса
+        не поддерживается.
+    """
+    handler_class = SURVEY_CALCULATORS.get(plan['type'])
+    if handler_class is None:
+        return None
+    instance = SimpleNamespace(survey_id=survey_id, results=results)
+    return handler_class(instance, plan).evaluate()
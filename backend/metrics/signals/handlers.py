@@ -6,9 +6,13 @@ from django.db.models.signals import (m2m_changed, post_delete, post_save,
                                       pre_save)
 from django.dispatch import receiver
 
-from metrics.models import BurnoutTracker, CompletedSurvey, Survey
-from metrics.result_calcs import MBICalculate, YesNoCalculate
+from metrics.models import (CompletedSurvey, Question, Survey,
+                            SurveyAvailability, SurveyType, Variant)
+from metrics.result_calcs import calculate_results, scoring_plans
+from metrics.validators import submission_schemas
+from notifications.delivery import BROADCAST_GROUP, department_group_name
 from notifications.models import Notification
+from notifications.service import notification_service
 
 User = get_user_model()
 
@@ -19,18 +23,10 @@ def calc_results_for_survey(sender, instance, **kwargs):
 
     Производится расчет результатов в зависимости от типа пройденого опроса
     и назначается время когда опрос можно пройти в следующий раз.
+    Для результатов, ожидающих асинхронного расчета, расчет пропускается.
     """
-    survey_types = {
-        'yn': YesNoCalculate,
-        'mbi': MBICalculate
-    }
-
-    survey_type = instance.survey.type.slug
-
-    if survey_type in survey_types:
-        handler_class = survey_types[survey_type]
-        handler = handler_class(instance)
-        handler.calculate()
+    if instance.status != CompletedSurvey.Status.PENDING:
+        calculate_results(instance)
 
     if instance.survey.frequency:
         instance.next_attempt_date = date.today() + timedelta(
@@ -42,14 +38,10 @@ def calc_results_for_survey(sender, instance, **kwargs):
 def add_mental_state_to_tracker(sender, instance, created, **kwargs):
     """Вызывается после сохранения объекта `CompletedSurvey`.
 
-    По итогам теста обновляет трекер выгорания.
+    По итогам теста обновляет трекер выгорания и его сводку.
     """
-    if created:
-        BurnoutTracker.objects.create(
-            employee=instance.employee,
-            mental_state=instance.mental_state,
-            date=instance.completion_date
-        )
+    if created and instance.status == CompletedSurvey.Status.DONE:
+        instance.add_to_burnout_tracker()
 
 
 @receiver(post_save, sender=Survey)
@@ -61,13 +53,12 @@ def create_notification_for_all(sender, instance, created, **kwargs):
     для всех активных пользователей сервиса.
     """
     if created and instance.for_all:
-        Notification.objects.bulk_create([
-            Notification(
-                incident_type=Notification.IncidentType.SURVEY,
-                incident_id=instance.id,
-                user=obj
-            ) for obj in User.objects.filter(is_active=True)
-        ])
+        notification_service.notify(
+            Notification.IncidentType.SURVEY,
+            instance.id,
+            User.objects.filter(is_active=True).values_list('id', flat=True),
+            groups=[BROADCAST_GROUP]
+        )
 
 
 @receiver(post_delete, sender=Survey)
@@ -93,12 +84,94 @@ def create_notification_by_departments(
     `departments`.
     """
     if action == 'post_add' and instance.for_all is False:
-        Notification.objects.bulk_create([
-            Notification(
-                incident_type=Notification.IncidentType.SURVEY,
-                incident_id=instance.id,
-                user=obj
-            ) for obj in User.objects.filter(
+        notification_service.notify(
+            Notification.IncidentType.SURVEY,
+            instance.id,
+            User.objects.filter(
                 Q(department__in=pk_set) & Q(is_active=True)
-            )
-        ])
+            ).values_list('id', flat=True),
+            groups=[department_group_name(pk) for pk in pk_set]
+        )
+
+
+def invalidate_survey_caches(survey_id):
+    scoring_plans.invalidate_on_commit(survey_id)
+    submission_schemas.invalidate_on_commit(survey_id)
+
+
+@receiver(post_save, sender=Survey)
+@receiver(post_delete, sender=Survey)
+def invalidate_survey_caches_on_survey_change(sender, instance, **kwargs):
+    """Сбрасывает кэшированные данные опроса при его изменении."""
+    invalidate_survey_caches(instance.id)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_survey_caches_on_question_change(sender, instance, **kwargs):
+    """Сбрасывает кэшированные данные опроса при изменении вопроса."""
+    invalidate_survey_caches(instance.survey_id)
+
+
+@receiver(post_save, sender=SurveyType)
+def invalidate_survey_caches_on_type_change(sender, instance, **kwargs):
+    """Сбрасывает кэшированные данные всех опросов измененного типа."""
+    for survey_id in Survey.objects.filter(
+        type=instance
+    ).values_list('id', flat=True):
+        invalidate_survey_caches(survey_id)
+
+
+@receiver(post_save, sender=Variant)
+@receiver(post_delete, sender=Variant)
+def invalidate_submission_schemas_on_variant_change(
+    sender, instance, **kwargs
+):
+    """Сбрасывает схемы ответов опросов, использующих вариант ответа."""
+    for survey_id in Survey.objects.filter(
+        type=instance.survey_type_id
+    ).values_list('id', flat=True):
+        submission_schemas.invalidate_on_commit(survey_id)
+
+
+@receiver(post_save, sender=CompletedSurvey)
+def update_survey_availability(sender, instance, created, **kwargs):
+    """Откладывает доступность пройденного опроса для сотрудника."""
+    if created:
+        SurveyAvailability.objects.mark_completed(
+            instance.employee_id,
+            instance.survey_id,
+            instance.next_attempt_date
+        )
+
+
+@receiver(post_save, sender=Survey)
+def sync_survey_availability(sender, instance, **kwargs):
+    """Обновляет аудиторию опроса при изменении автора или `for_all`."""
+    SurveyAvailability.objects.sync_survey(instance)
+
+
+@receiver(m2m_changed, sender=Survey.department.through)
+def sync_survey_availability_on_departments_change(
+    action, instance, reverse, pk_set, **kwargs
+):
+    """Обновляет аудиторию опросов при изменении их отделов."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        SurveyAvailability.objects.sync_survey(instance)
+        return
+    surveys = Survey.objects.all()
+    if pk_set:
+        surveys = surveys.filter(id__in=pk_set)
+    for survey in surveys:
+        SurveyAvailability.objects.sync_survey(survey)
+
+
+@receiver(post_save, sender=User)
+def sync_user_survey_availability(
+    sender, instance, created, update_fields, **kwargs
+):
+    """Обновляет доступные опросы нового пользователя или сменившего отдел."""
+    if created or instance.has_changed('department', update_fields):
+        SurveyAvailability.objects.sync_user(instance)
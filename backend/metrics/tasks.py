@@ -1,20 +1,97 @@
+import logging
 from datetime import date
 
 from celery import shared_task
+from django.db import transaction
+from django.db.models import Exists, OuterRef
 
 from notifications.models import Notification
+from notifications.service import notification_service
 
-from .models import CompletedSurvey
+from .models import BurnoutRollup, CompletedSurvey, SurveyAvailability
+
+logger = logging.getLogger(__name__)
 
 
 @shared_task(name='send_survey_notifications')
 def send_everyday_survey_notifications():
-    Notification.objects.bulk_create([
+    """
+    Напоминает о снова доступных опросах.
+
+    Пары пользователь-опрос выбираются одним запросом к
+    `SurveyAvailability` без неактивных пользователей и опросов и без
+    напоминаний, уже отправленных сегодня. Повторы при параллельном
+    запуске отсекаются ограничением уникальности уведомлений.
+    """
+    today = date.today()
+    sent_today = Notification.objects.filter(
+        user_id=OuterRef('user_id'),
+        incident_type=Notification.IncidentType.SURVEY,
+        incident_id=OuterRef('survey_id'),
+        creation_date__date=today,
+    )
+    pairs = (
+        SurveyAvailability.objects
+        .filter(
+            next_available_date=today,
+            user__is_active=True,
+            survey__is_active=True,
+        )
+        .filter(~Exists(sent_today))
+        .values_list('user_id', 'survey_id')
+    )
+    notification_service.bulk_notify([
         Notification(
             incident_type=Notification.IncidentType.SURVEY,
-            incident_id=obj.survey.id,
-            user=obj.employee
-        ) for obj in CompletedSurvey.objects.filter(
-            next_attempt_date=date.today()
-        )
+            incident_id=survey_id,
+            user_id=user_id
+        ) for user_id, survey_id in pairs.iterator(chunk_size=10000)
     ])
+
+
+@shared_task(name='score_completed_survey', ignore_result=True)
+def score_completed_survey(completed_survey_id):
+    """Рассчитывает результаты опроса, сохраненного в асинхронном режиме.
+
+    Расчет, обновление состояния сотрудника и запись в трекер выгорания
+    выполняются в одной транзакции.
+    """
+    with transaction.atomic():
+        instance = (
+            CompletedSurvey.objects
+            .select_for_update(of=('self',))
+            .select_related('employee', 'survey')
+            .filter(
+                id=completed_survey_id,
+                status=CompletedSurvey.Status.PENDING
+            )
+            .first()
+        )
+        if instance is None:
+            return
+
+        try:
+            with transaction.atomic():
+                instance.status = CompletedSurvey.Status.DONE
+                instance.save()
+                instance.add_to_burnout_tracker()
+        except Exception:
+            logger.exception(
+                'Ошибка расчета результатов опроса %s', completed_survey_id
+            )
+            CompletedSurvey.objects.filter(id=completed_survey_id).update(
+                status=CompletedSurvey.Status.FAILED
+            )
+
+
+@shared_task(name='rebuild_burnout_rollup', ignore_result=True)
+def rebuild_burnout_rollup():
+    """
+    Пересчитывает сводку трекера выгорания.
+
+    Сводка только увеличивается при добавлении записей трекера, поэтому
+    удаленные записи (вместе с сотрудником или из админки) исключаются
+    из нее при ежедневном пересчете.
+    """
+    count = BurnoutRollup.objects.rebuild()
+    logger.info('Сводка трекера выгорания пересчитана, записей: %s', count)
@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.test import APITestCase
+
+from metrics.models import CompletedSurvey
+
+User = get_user_model()
+
+
+class CompletedSurveyImportTest(APITestCase):
+    """Файл не в кодировке UTF-8 отклоняется до импорта."""
+
+    url = '/api/v1/metrics/surveys/results/import/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='hr@example.com', password='password',
+            first_name='Иван', last_name='Иванов', role=User.HR
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def upload(self, content: bytes):
+        return self.client.post(
+            self.url,
+            {'file': SimpleUploadedFile('results.csv', content)},
+            format='multipart'
+        )
+
+    def test_invalid_encoding(self):
+        content = 'employee,survey\nИванов,1\n'.encode('cp1251')
+        response = self.upload(content)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('file', response.json())
+        self.assertFalse(CompletedSurvey.objects.exists())
+
+    def test_valid_encoding(self):
+        response = self.upload('employee,survey\nИванов,1\n'.encode())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 0)
+        self.assertEqual(len(response.json()['errors']), 1)
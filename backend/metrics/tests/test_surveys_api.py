@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from metrics.models import (CompletedSurvey, Question, Survey,
+                            SurveyAvailability, SurveyType)
+
+User = get_user_model()
+
+
+class SurveyListQueriesTest(APITestCase):
+    """Число запросов списка опросов не зависит от числа опросов."""
+
+    surveys_count = 100
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='employee@example.com', password='password',
+            first_name='Иван', last_name='Иванов'
+        )
+        survey_type = SurveyType.objects.create(name='Тест', slug='test')
+        surveys = Survey.objects.bulk_create(
+            Survey(title=f'Опрос {index}', type=survey_type)
+            for index in range(cls.surveys_count)
+        )
+        Question.objects.bulk_create(
+            Question(survey=survey, text=f'Вопрос {index}')
+            for survey in surveys for index in range(3)
+        )
+        SurveyAvailability.objects.bulk_create(
+            SurveyAvailability(user=cls.user, survey=survey)
+            for survey in surveys
+        )
+        CompletedSurvey.objects.bulk_create(
+            CompletedSurvey(employee=cls.user, survey=survey, results=[])
+            for survey in surveys[:10]
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_survey_list(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                '/api/v1/metrics/surveys/', {'limit': self.surveys_count}
+            )
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(len(results), self.surveys_count)
+        self.assertEqual(
+            {survey['questions_quantity'] for survey in results}, {3}
+        )
+
+    def test_completed_survey_list(self):
+        with self.assertNumQueries(3) as queries:
+            response = self.client.get(
+                '/api/v1/metrics/surveys/results/', {'my_results': 1}
+            )
+        self.assertEqual(response.status_code, 200)
+        # количество вопросов считается только по опросам страницы
+        quantity_query = next(
+            query['sql'] for query in queries.captured_queries
+            if 'FROM "metrics_question"' in query['sql']
+        )
+        self.assertIn('"survey_id" IN (', quantity_query)
+        results = response.json()['results']
+        self.assertEqual(len(results), 10)
+        self.assertEqual(
+            {result['survey']['questions_quantity'] for result in results},
+            {3}
+        )
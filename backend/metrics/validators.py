@@ -1,20 +1,48 @@
 from datetime import date
 
+from django.apps import apps
 from django.core.exceptions import ValidationError
 
+from spare_kits.cache import VersionedCache
+
+
+def build_submission_schema(survey_id: int) -> dict:
+    """Собирает данные опроса, необходимые для проверки ответов."""
+    survey_model = apps.get_model('metrics', 'Survey')
+    question_model = apps.get_model('metrics', 'Question')
+    variant_model = apps.get_model('metrics', 'Variant')
+
+    survey_type = (
+        survey_model.objects
+        .filter(id=survey_id)
+        .values_list('type', flat=True)
+        .first()
+    )
+    return {
+        'questions': frozenset(
+            question_model.objects
+            .filter(survey_id=survey_id)
+            .values_list('id', flat=True)
+        ),
+        'values': frozenset(
+            variant_model.objects
+            .filter(survey_type=survey_type)
+            .values_list('value', flat=True)
+        ),
+    }
+
+
+submission_schemas = VersionedCache(
+    'submission_schema', build_submission_schema
+)
+
 
 def validate_results(value):
     pass
 
 
-def validate_completed_survey(
-    survey: int,
-    results: list,
-    employee: object,
-    completed_survey: object,
-    variant: object
-):
-    # переделать это все по человечески
+def validate_survey_results(survey_id: int, results: list):
+    """Проверяет ответы по схеме опроса, без обращений к БД."""
     questions = [item['question_id'] for item in results]
     values = [item['variant_value'] for item in results]
 
@@ -31,26 +59,23 @@ def validate_completed_survey(
     if len(set(questions)) != len(questions):
         raise ValidationError('id в списке вопросов не должны повторяться.')
 
-    if survey.questions.count() != len(questions):
+    schema = submission_schemas.get(survey_id)
+    question_ids = schema['questions']
+
+    if len(question_ids) != len(questions):
         raise ValidationError(
             'Количество предоставленных id вопросов в списке не соответствует '
             'их количеству в данном опросе.'
         )
 
-    question_ids = list(survey.questions.values_list('id', flat=True))
-
-    if set(questions) != set(question_ids):
-        missing_ids = set(questions) - set(question_ids)
+    if set(questions) != question_ids:
+        missing_ids = set(questions) - question_ids
         raise ValidationError(
             'Предоставленные id вопросов '
             f'{list(missing_ids)} не содержатся в данном опросе.'
         )
 
-    variants_values = set(
-        variant.objects
-        .filter(survey_type=survey.type)
-        .values_list('value', flat=True)
-    )
+    variants_values = schema['values']
 
     for value in list(set(values)):
         if value not in variants_values:
@@ -60,6 +85,16 @@ def validate_completed_survey(
                 f'{list(variants_values)}'
             )
 
+
+def validate_completed_survey(
+    survey: int,
+    results: list,
+    employee: object,
+    completed_survey: object
+):
+    # переделать это все по человечески
+    validate_survey_results(survey.id, results)
+
     filter_params = {
         'employee': employee,
         'survey': survey,
@@ -0,0 +1,100 @@
+from django.conf import settings
+
+from spare_kits.redis import get_redis
+
+
+class NotificationBuffer:
+    """
+    Буфер доставки уведомлений пользователям.
+
+    Первое уведомление доставляется сразу и открывает для пользователя
+    окно, длительность которого зависит от типа уведомления. Уведомления,
+    пришедшие в течение окна, копятся в Redis и доставляются одной
+    отправкой после его окончания, поэтому серия уведомлений дает не больше
+    одного письма и одного обновления вебсокета за окно.
+    """
+
+    prefix = 'notifications'
+
+    def window_key(self, user_id) -> str:
+        return f'{self.prefix}:window:{user_id}'
+
+    def pending_key(self, user_id) -> str:
+        return f'{self.prefix}:pending:{user_id}'
+
+    def flush_key(self, user_id) -> str:
+        return f'{self.prefix}:flush:{user_id}'
+
+    @staticmethod
+    def get_window(incident_type: str = None) -> int:
+        """Длительность окна в миллисекундах."""
+        seconds = settings.NOTIFICATIONS_DEBOUNCE_WINDOWS.get(
+            incident_type, settings.NOTIFICATIONS_DEBOUNCE_WINDOW
+        )
+        return int(seconds * 1000)
+
+    def add(self, user_ids: list, incident_type: str):
+        """
+        Учитывает новые уведомления пользователей.
+
+        Returns:
+            tuple: пользователи для немедленной доставки и задержки
+            отложенной доставки в секундах для тех, кому ее нужно
+            запланировать.
+        """
+        window = self.get_window(incident_type)
+        if window <= 0 or not user_ids:
+            return list(user_ids), {}
+
+        redis = get_redis()
+        with redis.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                pipe.set(self.window_key(user_id), 1, nx=True, px=window)
+            opened = pipe.execute()
+
+        immediate = []
+        buffered = []
+        for user_id, is_opened in zip(user_ids, opened):
+            (immediate if is_opened else buffered).append(user_id)
+        if not buffered:
+            return immediate, {}
+
+        with redis.pipeline(transaction=False) as pipe:
+            for user_id in buffered:
+                pipe.sadd(self.pending_key(user_id), incident_type)
+                pipe.pexpire(self.pending_key(user_id), window * 2)
+                pipe.pttl(self.window_key(user_id))
+            ttls = pipe.execute()[2::3]
+
+        countdowns = {
+            user_id: max(ttl, 0) for user_id, ttl in zip(buffered, ttls)
+        }
+        # отложенная доставка планируется одна на окно
+        with redis.pipeline(transaction=False) as pipe:
+            for user_id, ttl in countdowns.items():
+                pipe.set(
+                    self.flush_key(user_id), 1, nx=True, px=ttl + window
+                )
+            scheduled = pipe.execute()
+
+        return immediate, {
+            user_id: ttl / 1000
+            for (user_id, ttl), is_new in zip(countdowns.items(), scheduled)
+            if is_new
+        }
+
+    def pop(self, user_id) -> set:
+        """Забирает накопленные типы уведомлений и открывает новое окно."""
+        with get_redis().pipeline() as pipe:
+            pipe.smembers(self.pending_key(user_id))
+            pipe.delete(self.pending_key(user_id), self.flush_key(user_id))
+            incident_types = pipe.execute()[0]
+
+        if incident_types:
+            window = max(self.get_window(type_) for type_ in incident_types)
+            if window > 0:
+                get_redis().set(self.window_key(user_id), 1, px=window)
+        return incident_types
+
+
+notification_buffer = NotificationBuffer()
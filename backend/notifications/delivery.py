@@ -0,0 +1,302 @@
+import asyncio
+import json
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from spare_kits import notification_email_service as email_service
+from spare_kits.redis import get_redis
+
+from .digest import notification_digest
+from .models import Notification
+from .presence import presence
+from .stats import delivery_stats
+from .unread import unread_cache
+
+User = get_user_model()
+
+# последний отправленный список живет неделю, после этого следующее
+# изменение придет как добавление всех непросмотренных уведомлений
+SNAPSHOT_TTL = 7 * 24 * 60 * 60
+
+# изменения для сокетов групп хранятся до их оповещения о событии
+DELTA_TTL = 60 * 60
+
+
+# группа channel layer с сокетами всех пользователей
+BROADCAST_GROUP = 'notifications_all'
+
+
+def user_group_name(user_id: int) -> str:
+    """Имя группы channel layer с сокетами пользователя."""
+    return 'user_%s' % user_id
+
+
+def department_group_name(department_id: int) -> str:
+    """Имя группы channel layer с сокетами сотрудников отдела."""
+    return 'department_%s' % department_id
+
+
+def sequence_key(user_id: int) -> str:
+    return f'notifications:seq:{user_id}'
+
+
+def snapshot_key(user_id: int) -> str:
+    return f'notifications:snapshot:{user_id}'
+
+
+def delta_key(user_id: int) -> str:
+    return f'notifications:delta:{user_id}'
+
+
+def get_sequence(user_id: int) -> int:
+    """Текущий номер версии списка уведомлений пользователя."""
+    return int(get_redis().get(sequence_key(user_id)) or 0)
+
+
+def get_unread_notifications(user_ids) -> dict:
+    """
+    Непросмотренные уведомления пользователей, собранные одним запросом.
+
+    Returns:
+        dict: списки уведомлений в формате вебсокета по id пользователей.
+    """
+    unread = {user_id: [] for user_id in user_ids}
+    rows = (
+        Notification.objects
+        .filter(user_id__in=unread, is_viewed=False)
+        .values('user_id', 'id', 'incident_type', 'incident_id')
+    )
+    for row in rows:
+        unread[row.pop('user_id')].append(row)
+    return unread
+
+
+def send_to_websockets(messages: dict):
+    """
+    Отправляет сообщения в сокеты пользователей.
+
+    Все `group_send` выполняются конкурентно в одном цикле событий.
+
+    Args:
+        messages (dict): сообщения по id пользователей.
+    """
+    if not messages:
+        return
+    channel_layer = get_channel_layer()
+
+    async def send_all():
+        await asyncio.gather(*(
+            channel_layer.group_send(
+                user_group_name(user_id),
+                {'type': 'notification', 'message': message}
+            ) for user_id, message in messages.items()
+        ))
+
+    async_to_sync(send_all)()
+    delivery_stats.incr('websocket', len(messages))
+
+
+def store_deltas(deltas: dict):
+    """Сохраняет изменения списков для сокетов групп."""
+    if not deltas:
+        return
+    with get_redis().pipeline(transaction=False) as pipe:
+        for user_id, delta in deltas.items():
+            pipe.set(
+                delta_key(user_id),
+                json.dumps(delta, ensure_ascii=False),
+                ex=DELTA_TTL
+            )
+        pipe.execute()
+
+
+def get_stored_delta(user_id: int):
+    """Последние сохраненные для сокетов групп изменения или None."""
+    delta = get_redis().get(delta_key(user_id))
+    return json.loads(delta) if delta else None
+
+
+def send_to_groups(groups, incident_type: str):
+    """
+    Сообщает сокетам групп о новом событии одной отправкой на группу.
+
+    Отправляется после того, как изменения списков всех получателей
+    сохранены `store_deltas`. Сокеты отправляют изменения своих
+    пользователей, см. `UserNotifyConsumer.notification_incident`.
+    """
+    if not groups:
+        return
+    channel_layer = get_channel_layer()
+    event = {
+        'type': 'notification.incident',
+        'incident_type': incident_type,
+    }
+
+    async def send_all():
+        await asyncio.gather(*(
+            channel_layer.group_send(group, event) for group in groups
+        ))
+
+    async_to_sync(send_all)()
+    delivery_stats.incr('group', len(groups))
+
+
+def send_emails(user_ids, incident_type: str):
+    """
+    Отправляет напоминание о новых уведомлениях пользователям не в сети.
+
+    Пользователи с открытым вебсокетом получают уведомления только в него.
+    С `NOTIFICATIONS_EMAIL_DIGEST` напоминания копятся для ежечасной
+    сводки `send_notification_digests`.
+    """
+    if not user_ids:
+        return
+    online = presence.get_online(user_ids)
+    offline = [user_id for user_id in user_ids if user_id not in online]
+    delivery_stats.incr('email_skipped', len(online))
+    if not offline:
+        return
+    if settings.NOTIFICATIONS_EMAIL_DIGEST:
+        notification_digest.add(offline, incident_type)
+        delivery_stats.incr('digest', len(offline))
+        return
+    users = User.objects.filter(id__in=offline).only('id', 'email')
+    for user in users:
+        email_service.send_notification_on_email(user, incident_type)
+    delivery_stats.incr('email', len(offline))
+
+
+def send_emails_by_types(pending: dict):
+    """
+    Отправляет сводные письма о новых уведомлениях.
+
+    Письма получают только пользователи, у которых остались
+    непросмотренные уведомления.
+
+    Args:
+        pending (dict): множества типов уведомлений по id пользователей.
+    """
+    unread_user_ids = set(
+        Notification.objects
+        .filter(user_id__in=pending, is_viewed=False)
+        .values_list('user_id', flat=True)
+        .distinct()
+    )
+    users = User.objects.filter(id__in=unread_user_ids).only('id', 'email')
+    for user in users:
+        email_service.send_notification_on_email(
+            user, ', '.join(sorted(pending[user.id]))
+        )
+    delivery_stats.incr('email', len(unread_user_ids))
+
+
+def build_deltas(unread: dict) -> dict:
+    """
+    Изменения списков непросмотренных уведомлений с прошлой отправки.
+
+    Последний отправленный список id хранится в Redis. Для пользователей
+    с изменениями увеличивается номер версии списка.
+
+    Returns:
+        dict: изменения по id пользователей, без пользователей,
+        у которых ничего не изменилось.
+    """
+    redis = get_redis()
+    user_ids = list(unread)
+    with redis.pipeline(transaction=False) as pipe:
+        for user_id in user_ids:
+            pipe.smembers(snapshot_key(user_id))
+        snapshots = pipe.execute()
+
+    deltas = {}
+    gone_ids = set()
+    for user_id, snapshot in zip(user_ids, snapshots):
+        previous = {int(pk) for pk in snapshot}
+        current = {item['id'] for item in unread[user_id]}
+        added = [
+            item for item in unread[user_id] if item['id'] not in previous
+        ]
+        gone = previous - current
+        if added or gone:
+            deltas[user_id] = {'added': added, 'gone': gone}
+            gone_ids |= gone
+    if not deltas:
+        return {}
+
+    viewed_ids = set(
+        Notification.objects
+        .filter(id__in=gone_ids, is_viewed=True)
+        .values_list('id', flat=True)
+    ) if gone_ids else set()
+
+    with redis.pipeline(transaction=False) as pipe:
+        for user_id in deltas:
+            pipe.delete(snapshot_key(user_id))
+            if unread[user_id]:
+                pipe.sadd(
+                    snapshot_key(user_id),
+                    *(item['id'] for item in unread[user_id])
+                )
+                pipe.expire(snapshot_key(user_id), SNAPSHOT_TTL)
+        for user_id in deltas:
+            pipe.incr(sequence_key(user_id))
+        sequences = pipe.execute()[-len(deltas):]
+
+    for (user_id, delta), sequence in zip(deltas.items(), sequences):
+        gone = delta.pop('gone')
+        delta.update({
+            'seq': sequence,
+            'removed': sorted(gone - viewed_ids),
+            'viewed': sorted(gone & viewed_ids),
+        })
+    return deltas
+
+
+def deliver_notifications(user_ids, incident_type: str = None, email=True,
+                          groups=None):
+    """
+    Отправляет пользователям изменения списков уведомлений.
+
+    Формат отправляемых в вебсокет данных:
+        `seq` - номер версии списка, растет с каждым изменением
+        `added` - новые непросмотренные уведомления
+        `removed` - id удаленных уведомлений
+        `viewed` - id просмотренных уведомлений
+        `
+        {
+            'seq': 12,
+            'added': [
+                {'id': 1, 'incident_type': 'Опрос', 'incident_id': 1},
+            ],
+            'removed': [],
+            'viewed': [3],
+        }
+        `
+    Операции идемпотентны. Клиенты без поддержки изменений получают
+    полный список от `UserNotifyConsumer`. Прочитанные списки также
+    обновляют кэш непросмотренных уведомлений `unread_cache`.
+
+    Args:
+        user_ids: id пользователей.
+        incident_type (str, optional): тип события для письма.
+        email (bool, optional): отправлять ли напоминание на email.
+        groups (list, optional): группы сокетов, охватывающие всех
+            пользователей. Изменения не отправляются каждому пользователю,
+            а сохраняются для сокетов групп, которым после доставки всем
+            получателям отправляется событие `send_to_groups`.
+    """
+    unread = get_unread_notifications(user_ids)
+    unread_cache.refresh(unread)
+    deltas = build_deltas(unread)
+    if groups:
+        store_deltas(deltas)
+    else:
+        send_to_websockets(deltas)
+    if email and incident_type:
+        send_emails(
+            [user_id for user_id, delta in deltas.items() if delta['added']],
+            incident_type
+        )
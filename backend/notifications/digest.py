@@ -0,0 +1,52 @@
+from spare_kits.redis import get_redis
+
+
+class NotificationDigest:
+    """
+    Накопление напоминаний о новых уведомлениях для сводного письма.
+
+    Для каждого пользователя хранятся типы новых уведомлений, а в общем
+    множестве - пользователи, которым нужно отправить сводку.
+    """
+
+    prefix = 'notifications:digest'
+
+    @property
+    def users_key(self) -> str:
+        return f'{self.prefix}:users'
+
+    def types_key(self, user_id) -> str:
+        return f'{self.prefix}:types:{user_id}'
+
+    def add(self, user_ids, incident_type: str):
+        if not user_ids:
+            return
+        with get_redis().pipeline() as pipe:
+            for user_id in user_ids:
+                pipe.sadd(self.types_key(user_id), incident_type)
+            pipe.sadd(self.users_key, *user_ids)
+            pipe.execute()
+
+    def pop(self, count: int) -> dict:
+        """
+        Забирает накопленные типы уведомлений `count` пользователей.
+
+        Returns:
+            dict: множества типов уведомлений по id пользователей.
+        """
+        redis = get_redis()
+        user_ids = redis.spop(self.users_key, count) or []
+        if not user_ids:
+            return {}
+        with redis.pipeline() as pipe:
+            for user_id in user_ids:
+                pipe.smembers(self.types_key(user_id))
+                pipe.delete(self.types_key(user_id))
+            results = pipe.execute()
+        return {
+            int(user_id): types
+            for user_id, types in zip(user_ids, results[::2]) if types
+        }
+
+
+notification_digest = NotificationDigest()
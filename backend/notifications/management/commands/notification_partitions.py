@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from notifications.partitions import notification_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        'Создает помесячные секции таблицы уведомлений на следующие '
+        'месяцы, с --setup - секционирует таблицу (только PostgreSQL).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--setup',
+            action='store_true',
+            help=(
+                'Перенести таблицу уведомлений в помесячные секции. '
+                'Таблица блокируется на время копирования данных.'
+            )
+        )
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=settings.NOTIFICATIONS_PARTITIONS_AHEAD,
+            help='На сколько месяцев вперед создать секции.'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError(
+                'Секционирование поддерживается только в PostgreSQL.'
+            )
+
+        if options['setup']:
+            if notification_partitions.is_enabled():
+                raise CommandError('Таблица уведомлений уже секционирована.')
+            notification_partitions.setup(options['months'])
+            self.stdout.write(self.style.SUCCESS(
+                'Таблица уведомлений секционирована.'
+            ))
+            return
+
+        if not notification_partitions.is_enabled():
+            raise CommandError(
+                'Таблица уведомлений не секционирована, используйте --setup.'
+            )
+        created = notification_partitions.create(options['months'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано секций: {len(created)}.'
+        ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from notifications.stats import delivery_stats
+
+
+class Command(BaseCommand):
+    help = 'Выводит счетчики доставки уведомлений по дням.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=7,
+            help='За сколько последних дней вывести счетчики.'
+        )
+
+    def handle(self, *args, **options):
+        fields = delivery_stats.fields
+        self.stdout.write('\t'.join(('дата\t', *fields)))
+        for day, row in delivery_stats.get(options['days']).items():
+            values = (str(row.get(field, 0)) for field in fields)
+            self.stdout.write('\t'.join((day.isoformat(), *values)))
@@ -0,0 +1,31 @@
+from django.db import connections, models
+
+
+class NotificationManager(models.Manager):
+
+    batch_size = 1000
+
+    def delete_ids(self, ids) -> int:
+        """
+        Удаляет уведомления по id запросами `DELETE` без сигналов.
+
+        Обработчики `post_delete` отправляют обновление на каждое
+        уведомление, поэтому при массовом удалении они не вызываются,
+        а получатели обновляются вызывающим кодом.
+
+        Returns:
+            int: количество удаленных уведомлений.
+        """
+        ids = list(ids)
+        table = self.model._meta.db_table
+        deleted = 0
+        with connections[self.db].cursor() as cursor:
+            for start in range(0, len(ids), self.batch_size):
+                batch = ids[start:start + self.batch_size]
+                placeholders = ', '.join(['%s'] * len(batch))
+                cursor.execute(
+                    f'DELETE FROM "{table}" WHERE id IN ({placeholders})',
+                    batch
+                )
+                deleted += cursor.rowcount
+        return deleted
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.1 on 2026-10-18 19:56
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+from django.db.models import Count, Min
+from django.db.models.functions import TruncDate
+
+
+def delete_daily_duplicates(apps, schema_editor):
+    Notification = apps.get_model('notifications', 'Notification')
+    duplicates = (
+        Notification.objects
+        .order_by()
+        .values(
+            'user_id', 'incident_type', 'incident_id',
+            day=TruncDate('creation_date'),
+        )
+        .annotate(first_id=Min('id'), count=Count('id'))
+        .filter(count__gt=1)
+    )
+    for row in duplicates:
+        Notification.objects.filter(
+            user_id=row['user_id'],
+            incident_type=row['incident_type'],
+            incident_id=row['incident_id'],
+            creation_date__date=row['day'],
+        ).exclude(id=row['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            delete_daily_duplicates, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(models.F('user'), models.F('incident_type'), models.F('incident_id'), django.db.models.functions.datetime.TruncDate('creation_date'), name='notification_daily_uniqueness'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.1 on 2026-10-18 19:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_notification_daily_uniqueness'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-creation_date'], name='notification_user_created'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_viewed', False)), fields=['user', '-id'], name='notification_user_unread'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['incident_type', 'incident_id'], name='notification_incident'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_viewed', True)), fields=['creation_date'], name='notification_viewed_created'),
+        ),
+    ]
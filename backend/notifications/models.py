@@ -1,7 +1,11 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import Q, UniqueConstraint
+from django.db.models.functions import TruncDate
 from django.utils import timezone
 
+from .managers import NotificationManager
+
 User = get_user_model()
 
 
@@ -37,10 +41,42 @@ class Notification(models.Model):
         default=timezone.now,
     )
 
+    objects = NotificationManager()
+
     class Meta:
         ordering = ('-creation_date',)
         verbose_name = 'уведомление'
         verbose_name_plural = 'уведомления'
+        constraints = [
+            # не больше одного уведомления о событии в день
+            UniqueConstraint(
+                'user',
+                'incident_type',
+                'incident_id',
+                TruncDate('creation_date'),
+                name='notification_daily_uniqueness',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=('user', '-creation_date'),
+                name='notification_user_created',
+            ),
+            models.Index(
+                fields=('user', '-id'),
+                name='notification_user_unread',
+                condition=Q(is_viewed=False),
+            ),
+            models.Index(
+                fields=('incident_type', 'incident_id'),
+                name='notification_incident',
+            ),
+            models.Index(
+                fields=('creation_date',),
+                name='notification_viewed_created',
+                condition=Q(is_viewed=True),
+            ),
+        ]
 
     def __str__(self):
         return f'Уведомление №{self.id} для пользователя {self.user}'
@@ -0,0 +1,215 @@
+import re
+from datetime import date, datetime
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Notification
+
+User = get_user_model()
+
+
+def add_months(month: date, count: int) -> date:
+    """Первое число месяца, отстоящего от `month` на `count` месяцев."""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class NotificationPartitions:
+    """
+    Помесячное секционирование таблицы уведомлений в PostgreSQL.
+
+    Секционирование необязательно и включается командой
+    `notification_partitions --setup`, которая переносит таблицу в
+    секции по месяцам `creation_date`. Последующие месяцы создаются
+    задачей `create_notification_partitions` или той же командой,
+    а старые секции без непросмотренных уведомлений удаляются целиком.
+
+    Первичный ключ секционированной таблицы - (id, creation_date).
+    Ограничение `notification_daily_uniqueness` с выражением не может
+    быть ключом секционированной таблицы, поэтому такой же уникальный
+    индекс создается в каждой секции. Секции разбиты по полуночи
+    текущего часового пояса, день целиком попадает в одну секцию, и
+    уникальность в секциях совпадает с уникальностью во всей таблице.
+    """
+
+    table = Notification._meta.db_table
+    name_pattern = re.compile(r'_y(\d{4})m(\d{2})$')
+
+    def partition_name(self, month: date) -> str:
+        return f'{self.table}_y{month.year}m{month.month:02d}'
+
+    def parse_month(self, name: str):
+        match = self.name_pattern.search(name)
+        if match is None:
+            return None
+        return date(int(match.group(1)), int(match.group(2)), 1)
+
+    @staticmethod
+    def month_start(month: date) -> datetime:
+        return timezone.make_aware(datetime(month.year, month.month, 1))
+
+    def is_enabled(self) -> bool:
+        """Секционирована ли таблица уведомлений."""
+        if connection.vendor != 'postgresql':
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT relkind = 'p' FROM pg_class "
+                "WHERE oid = to_regclass(%s)",
+                [self.table]
+            )
+            row = cursor.fetchone()
+        return bool(row and row[0])
+
+    def get_partitions(self) -> dict:
+        """Помесячные секции таблицы по первым числам месяцев."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT child.relname FROM pg_inherits '
+                'JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+                'WHERE pg_inherits.inhparent = %s::regclass',
+                [self.table]
+            )
+            names = [row[0] for row in cursor.fetchall()]
+        partitions = {}
+        for name in names:
+            month = self.parse_month(name)
+            if month is not None:
+                partitions[month] = name
+        return partitions
+
+    @staticmethod
+    def create_unique_index(cursor, name: str):
+        """Создает в секции индекс `notification_daily_uniqueness`."""
+        time_zone = timezone.get_current_timezone_name().replace("'", "''")
+        cursor.execute(
+            f'CREATE UNIQUE INDEX IF NOT EXISTS "{name}_daily_uniqueness" '
+            f'ON "{name}" (user_id, incident_type, incident_id, '
+            f"((creation_date AT TIME ZONE '{time_zone}')::date))"
+        )
+
+    def create_partition(self, cursor, month: date):
+        name = self.partition_name(month)
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS "{name}" '
+            f'PARTITION OF "{self.table}" FOR VALUES FROM (%s) TO (%s)',
+            [self.month_start(month), self.month_start(add_months(month, 1))]
+        )
+        self.create_unique_index(cursor, name)
+
+    def create(self, months_ahead: int, since: date = None) -> list:
+        """
+        Создает секции на `months_ahead` месяцев вперед.
+
+        Первая секция - месяц `since`, по умолчанию - текущий.
+
+        Returns:
+            list: имена созданных секций.
+        """
+        current = timezone.localdate().replace(day=1)
+        month = (since or current).replace(day=1)
+        last = add_months(current, months_ahead)
+        existing = self.get_partitions()
+        created = []
+        with transaction.atomic(), connection.cursor() as cursor:
+            while month <= last:
+                if month not in existing:
+                    self.create_partition(cursor, month)
+                    created.append(self.partition_name(month))
+                month = add_months(month, 1)
+        return created
+
+    def drop_before(self, cutoff: date) -> tuple:
+        """
+        Удаляет секции, все уведомления которых созданы до `cutoff`.
+
+        Удаляются только секции без непросмотренных уведомлений.
+        Просмотренные уведомления остальных секций удаляются построчно
+        `NotificationRetention`.
+
+        Returns:
+            tuple: имена удаленных секций и id пользователей, уведомления
+            которых в них были.
+        """
+        partitions = [
+            name for month, name in sorted(self.get_partitions().items())
+            if add_months(month, 1) <= cutoff
+        ]
+        dropped = []
+        user_ids = set()
+        for name in partitions:
+            with transaction.atomic(), connection.cursor() as cursor:
+                # блокировка не дает изменить секцию между проверкой
+                # и удалением
+                cursor.execute(
+                    f'LOCK TABLE "{name}" IN ACCESS EXCLUSIVE MODE'
+                )
+                cursor.execute(
+                    f'SELECT EXISTS (SELECT 1 FROM "{name}" '
+                    f'WHERE NOT is_viewed)'
+                )
+                if cursor.fetchone()[0]:
+                    continue
+                cursor.execute(f'SELECT DISTINCT user_id FROM "{name}"')
+                user_ids.update(row[0] for row in cursor.fetchall())
+                cursor.execute(f'DROP TABLE "{name}"')
+            dropped.append(name)
+        return dropped, user_ids
+
+    def setup(self, months_ahead: int):
+        """
+        Переносит таблицу уведомлений в помесячные секции.
+
+        Перенос выполняется в одной транзакции, поэтому на время
+        копирования данных таблица блокируется.
+        """
+        old_table = f'{self.table}_unpartitioned'
+        user_table = User._meta.db_table
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f'ALTER TABLE "{self.table}" RENAME TO "{old_table}"'
+            )
+            cursor.execute(
+                f'CREATE TABLE "{self.table}" (LIKE "{old_table}" '
+                f'INCLUDING DEFAULTS INCLUDING IDENTITY) '
+                f'PARTITION BY RANGE (creation_date)'
+            )
+            cursor.execute(f'SELECT MIN(creation_date) FROM "{old_table}"')
+            first = cursor.fetchone()[0]
+            self.create(
+                months_ahead,
+                since=timezone.localdate(first) if first else None
+            )
+            cursor.execute(
+                f'CREATE TABLE "{self.table}_default" '
+                f'PARTITION OF "{self.table}" DEFAULT'
+            )
+            self.create_unique_index(cursor, f'{self.table}_default')
+            cursor.execute(
+                f'INSERT INTO "{self.table}" SELECT * FROM "{old_table}"'
+            )
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence('\"{self.table}\"', "
+                f"'id'), COALESCE(MAX(id), 0) + 1, false) "
+                f'FROM "{self.table}"'
+            )
+            # имена ключа и индексов освобождаются вместе со старой таблицей
+            cursor.execute(f'DROP TABLE "{old_table}"')
+            cursor.execute(
+                f'ALTER TABLE "{self.table}" '
+                f'ADD PRIMARY KEY (id, creation_date)'
+            )
+            cursor.execute(
+                f'ALTER TABLE "{self.table}" '
+                f'ADD CONSTRAINT "{self.table}_user_id_fk" '
+                f'FOREIGN KEY (user_id) REFERENCES "{user_table}" (id) '
+                f'DEFERRABLE INITIALLY DEFERRED'
+            )
+            with connection.schema_editor(atomic=False) as schema_editor:
+                for index in Notification._meta.indexes:
+                    schema_editor.add_index(Notification, index)
+
+
+notification_partitions = NotificationPartitions()
@@ -0,0 +1,52 @@
+import time
+
+from django.conf import settings
+
+from spare_kits.redis import get_redis
+
+
+class Presence:
+    """
+    Присутствие пользователей в сети по открытым вебсокетам.
+
+    Для каждого пользователя в Redis хранятся каналы его сокетов со
+    временем, до которого канал считается активным. Сокет продлевает
+    его каждые `NOTIFICATIONS_PRESENCE_HEARTBEAT` секунд, поэтому
+    канал, закрытый без `disconnect`, пропадает через
+    `NOTIFICATIONS_PRESENCE_TIMEOUT` секунд.
+    """
+
+    prefix = 'notifications:presence'
+
+    def key(self, user_id) -> str:
+        return f'{self.prefix}:{user_id}'
+
+    def touch(self, user_id, channel_name: str):
+        """Отмечает, что сокет пользователя активен."""
+        timeout = settings.NOTIFICATIONS_PRESENCE_TIMEOUT
+        now = time.time()
+        with get_redis().pipeline() as pipe:
+            pipe.zadd(self.key(user_id), {channel_name: now + timeout})
+            pipe.zremrangebyscore(self.key(user_id), '-inf', now)
+            pipe.expire(self.key(user_id), timeout)
+            pipe.execute()
+
+    def leave(self, user_id, channel_name: str):
+        get_redis().zrem(self.key(user_id), channel_name)
+
+    def get_online(self, user_ids) -> set:
+        """Пользователи, у которых открыт хотя бы один сокет."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return set()
+        now = time.time()
+        with get_redis().pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                pipe.zcount(self.key(user_id), now, '+inf')
+            counts = pipe.execute()
+        return {
+            user_id for user_id, count in zip(user_ids, counts) if count
+        }
+
+
+presence = Presence()
@@ -0,0 +1,93 @@
+import time
+from datetime import date, datetime
+
+from django.conf import settings
+from django.utils import timezone
+
+from spare_kits.redis import get_redis
+
+from .models import Notification
+
+
+class NotificationRetention:
+    """
+    Удаление старых просмотренных уведомлений пачками.
+
+    Уведомления удаляются по возрастанию id пачками по
+    `NOTIFICATIONS_RETENTION_CHUNK_SIZE` с паузой
+    `NOTIFICATIONS_RETENTION_PAUSE` секунд между ними, пока не истечет
+    `NOTIFICATIONS_RETENTION_TIME_BUDGET` секунд. Каждая пачка удаляется
+    по id без сигналов `post_delete`. Последний удаленный id
+    хранится в Redis, поэтому прерванное удаление продолжается с места
+    остановки.
+    """
+
+    cursor_key = 'notifications:retention:cursor'
+
+    def get_cursor(self) -> int:
+        return int(get_redis().get(self.cursor_key) or 0)
+
+    def set_cursor(self, last_id: int):
+        get_redis().set(self.cursor_key, last_id)
+
+    def reset(self):
+        get_redis().delete(self.cursor_key)
+
+    def get_queryset(self, cutoff: date):
+        return Notification.objects.filter(
+            is_viewed=True,
+            creation_date__lte=timezone.make_aware(
+                datetime.combine(cutoff, datetime.min.time())
+            ),
+        )
+
+    def delete_chunk(self, cutoff: date, after_id: int) -> tuple:
+        """
+        Удаляет следующую пачку уведомлений.
+
+        Returns:
+            tuple: последний удаленный id или None, если удалять нечего,
+            количество удаленных уведомлений и id их пользователей.
+        """
+        rows = list(
+            self.get_queryset(cutoff)
+            .filter(id__gt=after_id)
+            .order_by('id')
+            .values_list('id', 'user_id')
+            [:settings.NOTIFICATIONS_RETENTION_CHUNK_SIZE]
+        )
+        if not rows:
+            return None, 0, set()
+        deleted = Notification.objects.delete_ids([pk for pk, _ in rows])
+        return rows[-1][0], deleted, {user_id for _, user_id in rows}
+
+    def run(self, cutoff: date) -> tuple:
+        """
+        Удаляет уведомления, созданные до `cutoff`, в пределах времени.
+
+        Returns:
+            tuple: признак завершения, количество удаленных уведомлений
+            и id пользователей, у которых были удалены уведомления.
+        """
+        started = time.monotonic()
+        after_id = self.get_cursor()
+        deleted = 0
+        user_ids = set()
+        while True:
+            last_id, chunk_deleted, chunk_user_ids = self.delete_chunk(
+                cutoff, after_id
+            )
+            if last_id is None:
+                self.reset()
+                return True, deleted, user_ids
+            self.set_cursor(last_id)
+            after_id = last_id
+            deleted += chunk_deleted
+            user_ids |= chunk_user_ids
+            elapsed = time.monotonic() - started
+            if elapsed >= settings.NOTIFICATIONS_RETENTION_TIME_BUDGET:
+                return False, deleted, user_ids
+            time.sleep(settings.NOTIFICATIONS_RETENTION_PAUSE)
+
+
+notification_retention = NotificationRetention()
@@ -0,0 +1,149 @@
+from django.db import IntegrityError, transaction
+
+from .delivery import deliver_notifications
+from .models import Notification
+from .tasks import fan_out_notifications
+from .unread import unread_cache
+
+
+class NotificationService:
+    """Массовое создание уведомлений с фоновой доставкой."""
+
+    batch_size = 1000
+
+    def bulk_notify(self, notifications: list, groups=None):
+        """
+        Сохраняет уведомления через `bulk_create` и запускает их доставку.
+
+        `bulk_create` не вызывает сигналы `post_save`, поэтому после
+        фиксации транзакции получатели передаются в фоновую рассылку.
+        Уведомления, уже отправленные пользователю о том же событии в этот
+        день, пропускаются ограничением `notification_daily_uniqueness`.
+
+        Args:
+            notifications (list): новые уведомления.
+            groups (list, optional): группы сокетов, охватывающие всех
+                получателей. Изменения не отправляются каждому
+                пользователю, а после доставки всем получателям в каждую
+                группу отправляется одно событие.
+        """
+        if not notifications:
+            return
+        self.create(notifications)
+
+        recipients = {}
+        for notification in notifications:
+            recipients.setdefault(notification.incident_type, set()).add(
+                notification.user_id
+            )
+        for incident_type, user_ids in recipients.items():
+            self.fan_out(sorted(user_ids), incident_type, groups)
+
+    def create(self, notifications: list):
+        """
+        Сохраняет уведомления и учитывает их в кэше непросмотренных.
+
+        Обычно повторов нет и уведомления сохраняются с получением id,
+        которые добавляются в кэш. Если среди них есть уже отправленные
+        сегодня, они пропускаются, но id сохраненных уведомлений
+        неизвестны, и кэш получателей сбрасывается.
+        """
+        try:
+            with transaction.atomic():
+                Notification.objects.bulk_create(
+                    notifications, batch_size=self.batch_size
+                )
+        except IntegrityError:
+            for notification in notifications:
+                notification.pk = None
+                notification._state.adding = True
+            Notification.objects.bulk_create(
+                notifications, batch_size=self.batch_size,
+                ignore_conflicts=True
+            )
+            user_ids = {notification.user_id for notification in notifications}
+            transaction.on_commit(lambda: unread_cache.invalidate(user_ids))
+        else:
+            transaction.on_commit(lambda: unread_cache.add(notifications))
+
+    def notify(self, incident_type: str, incident_id: int, user_ids,
+               groups=None):
+        """
+        Уведомляет пользователей о событии.
+
+        Args:
+            groups (list, optional): группы сокетов, охватывающие всех
+                получателей. В каждую группу отправляется одно сообщение
+                о событии вместо изменений каждому пользователю.
+        """
+        user_ids = list(user_ids)
+        if not user_ids:
+            return
+        self.bulk_notify([
+            Notification(
+                incident_type=incident_type,
+                incident_id=incident_id,
+                user_id=user_id
+            ) for user_id in user_ids
+        ], groups=groups)
+
+    def get_user_notifications(self, user_id: int, ids=None,
+                               incident_type: str = None,
+                               before_date=None):
+        """Уведомления пользователя, отобранные по всем указанным условиям."""
+        filters = {'user_id': user_id}
+        if ids is not None:
+            filters['id__in'] = ids
+        if incident_type:
+            filters['incident_type'] = incident_type
+        if before_date:
+            filters['creation_date__date__lt'] = before_date
+        return Notification.objects.filter(**filters)
+
+    def mark_viewed(self, user_id: int, **criteria) -> int:
+        """
+        Отмечает уведомления пользователя просмотренными одним `UPDATE`.
+
+        Returns:
+            int: количество отмеченных уведомлений.
+        """
+        updated = (
+            self.get_user_notifications(user_id, **criteria)
+            .filter(is_viewed=False)
+            .update(is_viewed=True)
+        )
+        if updated:
+            self.refresh(user_id)
+        return updated
+
+    def delete(self, user_id: int, **criteria) -> int:
+        """
+        Удаляет уведомления пользователя по id без сигналов.
+
+        Сигналы `post_delete` для отдельных уведомлений не вызываются,
+        на уведомления не ссылаются другие модели.
+
+        Returns:
+            int: количество удаленных уведомлений.
+        """
+        deleted = Notification.objects.delete_ids(
+            self.get_user_notifications(user_id, **criteria)
+            .values_list('id', flat=True)
+        )
+        if deleted:
+            self.refresh(user_id)
+        return deleted
+
+    def refresh(self, user_id: int):
+        """Отправляет пользователю одно обновление после фиксации."""
+        transaction.on_commit(
+            lambda: deliver_notifications([user_id], email=False)
+        )
+
+    def fan_out(self, user_ids: list, incident_type: str, groups=None):
+        transaction.on_commit(lambda: fan_out_notifications.delay(
+            user_ids, incident_type, groups
+        ))
+
+
+notification_service = NotificationService()
@@ -1,51 +1,41 @@
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
+from django.db import transaction
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from spare_kits import notification_email_service as email_service
 from spare_kits.wrappers import disable_for_loaddata
 
+from ..delivery import deliver_notifications
 from ..models import Notification
+from ..tasks import dispatch_notifications
+from ..unread import unread_cache
+
+
+def dispatch_created(notification):
+    """Доставляет новое уведомление и учитывает его в кэше."""
+    delayed = dispatch_notifications(
+        [notification.user_id], notification.incident_type
+    )
+    unread_cache.invalidate(delayed)
 
 
 @receiver(post_save, sender=Notification)
 @disable_for_loaddata
 def get_data_for_websocket_post_save(sender, instance, created, **kwargs):
-    """Вызывается при создании нового объекта модели `Notification`.
-
-    Отправляются данные пользователю в вебсокет и уведомление на email.
-    Формат отправляемых данных:
-        `notifications` - идентификаторы уведомлений, идентификаторы `событий`
-        и их типы
-        `
-        {
-            'notifications': [
-                {'id': 1, 'incident_type': 'Опрос', 'incident_id': 1},
-            ]
-        }
-        `
+    """Вызывается при сохранении объекта модели `Notification`.
+
+    О новом уведомлении пользователь узнает через буфер доставки: в
+    вебсокет и на email, не чаще одного раза за окно. При изменении
+    уведомления обновляются только данные в вебсокете.
+    Доставка выполняется после фиксации транзакции. Немедленная доставка
+    перечитывает кэш непросмотренных уведомлений из БД, при отложенной
+    кэш сбрасывается и будет прочитан из БД при обращении.
+    Уведомления, созданные через `bulk_create`, доставляются фоновой
+    рассылкой `NotificationService`.
     """
-    channel_layer = get_channel_layer()
-    group_name = 'user_%s' % instance.user.id
-    notifications = list(
-        instance.user.notifications.filter(is_viewed=False).values(
-            'id', 'incident_type', 'incident_id',
-        )
-    )
-    email_service.send_notification_on_email(
-        instance.user,
-        notifications[-1]['incident_type']
-    )
-    async_to_sync(channel_layer.group_send)(
-        group_name,
-        {
-            'type': 'notification',
-            'message': {
-                'notifications': notifications
-            }
-        }
-    )
+    if created:
+        transaction.on_commit(lambda: dispatch_created(instance))
+    else:
+        deliver_notifications([instance.user_id], email=False)
 
 
 @receiver(post_delete, sender=Notification)
@@ -55,19 +45,4 @@ def get_data_for_websocket_post_delete(sender, instance, **kwargs):
 
     Отправляются обновленные данные пользователю в вебсокет.
     """
-    channel_layer = get_channel_layer()
-    group_name = 'user_%s' % instance.user.id
-    notifications = list(
-        instance.user.notifications.filter(is_viewed=False).values(
-            'id', 'incident_type', 'incident_id',
-        )
-    )
-    async_to_sync(channel_layer.group_send)(
-        group_name,
-        {
-            'type': 'notification',
-            'message': {
-                'notifications': notifications
-            }
-        }
-    )
+    deliver_notifications([instance.user_id], email=False)
@@ -0,0 +1,47 @@
+from datetime import date, timedelta
+
+from spare_kits.redis import get_redis
+
+
+class DeliveryStats:
+    """
+    Счетчики доставки уведомлений по дням.
+
+    Поля:
+        `websocket` - изменения, отправленные в вебсокет пользователям
+        `group` - события, отправленные группам сокетов
+        `email` - отправленные письма
+        `email_skipped` - письма, не отправленные пользователям в сети
+        `digest` - напоминания, отложенные для сводного письма
+    """
+
+    prefix = 'notifications:stats'
+    fields = ('websocket', 'group', 'email', 'email_skipped', 'digest')
+    timeout = 90 * 24 * 60 * 60
+
+    def key(self, day: date) -> str:
+        return f'{self.prefix}:{day.isoformat()}'
+
+    def incr(self, field: str, count: int = 1):
+        if not count:
+            return
+        key = self.key(date.today())
+        with get_redis().pipeline(transaction=False) as pipe:
+            pipe.hincrby(key, field, count)
+            pipe.expire(key, self.timeout)
+            pipe.execute()
+
+    def get(self, days: int) -> dict:
+        """Счетчики за последние `days` дней по датам."""
+        dates = [date.today() - timedelta(days=day) for day in range(days)]
+        with get_redis().pipeline(transaction=False) as pipe:
+            for day in dates:
+                pipe.hgetall(self.key(day))
+            rows = pipe.execute()
+        return {
+            day: {field: int(value) for field, value in row.items()}
+            for day, row in zip(dates, rows)
+        }
+
+
+delivery_stats = DeliveryStats()
@@ -1,15 +1,169 @@
+import logging
 from datetime import date, timedelta
+from uuid import uuid4
 
 from celery import shared_task
-from django.db.models import Q
+from django.conf import settings
 
-from .models import Notification
+from spare_kits.redis import get_redis
+
+from .buffer import notification_buffer
+from .delivery import (deliver_notifications, send_emails_by_types,
+                       send_to_groups)
+from .digest import notification_digest
+from .partitions import notification_partitions
+from .retention import notification_retention
+
+logger = logging.getLogger(__name__)
+
+# счетчик пачек рассылки по группам живет, пока ее доставляют
+FAN_OUT_TTL = 24 * 60 * 60
+
+
+def deliver_updates(user_ids):
+    """Отправляет пользователям обновления без писем пачками рассылки."""
+    user_ids = sorted(user_ids)
+    chunk_size = max(settings.NOTIFICATIONS_FANOUT_CHUNK_SIZE, 1)
+    for index in range(0, len(user_ids), chunk_size):
+        deliver_notifications(
+            user_ids[index:index + chunk_size], email=False
+        )
 
 
 @shared_task(name='del_old_viewed_notifications')
 def delete_old_viwed_notifications(days):
-    date_earlier = date.today() - timedelta(days=int(days))
-    Notification.objects.filter(
-        Q(creation_date__lte=date_earlier)
-        & Q(is_viewed=True)
-    ).delete()
+    """
+    Удаляет просмотренные уведомления старше `days` дней.
+
+    Если таблица уведомлений секционирована, сначала удаляются целиком
+    секции месяцев, закончившихся до этой даты, если в них нет
+    непросмотренных уведомлений. Оставшиеся просмотренные уведомления
+    удаляются `NotificationRetention` в пределах бюджета времени, после
+    чего пользователям с удаленными уведомлениями отправляется по одному
+    обновлению. Если удалено не все, задача запускается снова и
+    продолжает с места остановки.
+    """
+    cutoff = date.today() - timedelta(days=int(days))
+    if notification_partitions.is_enabled():
+        partitions, user_ids = notification_partitions.drop_before(cutoff)
+        if partitions:
+            logger.info('Удалены секции уведомлений: %s', partitions)
+            deliver_updates(user_ids)
+
+    done, deleted, user_ids = notification_retention.run(cutoff)
+    deliver_updates(user_ids)
+
+    logger.info('Удалено старых уведомлений: %s', deleted)
+    if not done:
+        delete_old_viwed_notifications.apply_async(
+            (days,), countdown=settings.NOTIFICATIONS_RETENTION_PAUSE
+        )
+
+
+@shared_task(name='create_notification_partitions', ignore_result=True)
+def create_notification_partitions():
+    """Создает секции уведомлений на следующие месяцы."""
+    if notification_partitions.is_enabled():
+        notification_partitions.create(
+            settings.NOTIFICATIONS_PARTITIONS_AHEAD
+        )
+
+
+def dispatch_notifications(user_ids, incident_type, groups=None):
+    """
+    Доставляет новые уведомления с учетом буфера `NotificationBuffer`.
+
+    Пользователям без открытого окна уведомления доставляются сразу,
+    остальным - одной отложенной задачей по окончании окна.
+
+    Returns:
+        list: пользователи, доставка которым отложена.
+    """
+    immediate, delayed = notification_buffer.add(user_ids, incident_type)
+    if immediate:
+        deliver_notifications(immediate, incident_type, groups=groups)
+    for user_id, countdown in delayed.items():
+        flush_notifications.apply_async((user_id,), countdown=countdown)
+    return [user_id for user_id in user_ids if user_id not in immediate]
+
+
+@shared_task(name='flush_notifications', ignore_result=True)
+def flush_notifications(user_id):
+    """Доставляет уведомления, накопленные за окно буфера."""
+    incident_types = notification_buffer.pop(user_id)
+    if incident_types:
+        deliver_notifications([user_id], ', '.join(sorted(incident_types)))
+
+
+def finish_chunk(fan_out_key, groups, incident_type):
+    """
+    Учитывает доставленную пачку рассылки по группам сокетов.
+
+    После последней пачки группам отправляется событие, по которому
+    сокеты забирают сохраненные изменения.
+    """
+    if fan_out_key and get_redis().decr(fan_out_key) == 0:
+        get_redis().delete(fan_out_key)
+        send_to_groups(groups, incident_type)
+
+
+@shared_task(name='deliver_notifications', ignore_result=True)
+def deliver_notifications_batch(chunks, incident_type, groups=None,
+                                fan_out_key=None):
+    """
+    Доставляет уведомления первой пачке пользователей.
+
+    Оставшиеся пачки передаются следующей задаче, поэтому пачки одной
+    цепочки доставляются по очереди.
+    """
+    try:
+        dispatch_notifications(chunks[0], incident_type, groups)
+    except Exception:
+        # ошибка одной пачки не должна останавливать остальные в цепочке
+        logger.exception(
+            'Ошибка доставки уведомлений %s пользователям', incident_type
+        )
+    finish_chunk(fan_out_key, groups, incident_type)
+    if len(chunks) > 1:
+        deliver_notifications_batch.delay(
+            chunks[1:], incident_type, groups, fan_out_key
+        )
+
+
+@shared_task(name='fan_out_notifications', ignore_result=True)
+def fan_out_notifications(user_ids, incident_type, groups=None):
+    """
+    Делит получателей на пачки и запускает их доставку.
+
+    Пачки распределяются по `NOTIFICATIONS_FANOUT_CONCURRENCY` цепочкам,
+    которые выполняются параллельно, а пачки внутри цепочки - по очереди.
+    С `groups` изменения сохраняются для сокетов групп, а после последней
+    пачки группам отправляется одно событие, см. `finish_chunk`.
+    """
+    chunk_size = max(settings.NOTIFICATIONS_FANOUT_CHUNK_SIZE, 1)
+    concurrency = max(settings.NOTIFICATIONS_FANOUT_CONCURRENCY, 1)
+    chunks = [
+        user_ids[index:index + chunk_size]
+        for index in range(0, len(user_ids), chunk_size)
+    ]
+    if not chunks:
+        return
+    fan_out_key = None
+    if groups:
+        fan_out_key = f'notifications:fanout:{uuid4().hex}'
+        get_redis().set(fan_out_key, len(chunks), ex=FAN_OUT_TTL)
+    for lane in range(min(concurrency, len(chunks))):
+        deliver_notifications_batch.delay(
+            chunks[lane::concurrency], incident_type, groups, fan_out_key
+        )
+
+
+@shared_task(name='send_notification_digests', ignore_result=True)
+def send_notification_digests():
+    """Отправляет пользователям сводные письма о новых уведомлениях."""
+    chunk_size = max(settings.NOTIFICATIONS_FANOUT_CHUNK_SIZE, 1)
+    while True:
+        pending = notification_digest.pop(chunk_size)
+        if not pending:
+            return
+        send_emails_by_types(pending)
@@ -0,0 +1,100 @@
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.test import TransactionTestCase, override_settings
+
+from api.v1.notifications.consumers import UserNotifyConsumer
+from conf.celery import app as celery_app
+from metrics.models import Survey
+from notifications.buffer import notification_buffer
+from notifications.delivery import delta_key, sequence_key, snapshot_key
+from notifications.models import Notification
+from notifications.unread import unread_cache
+from spare_kits.redis import get_redis
+
+User = get_user_model()
+
+
+@override_settings(
+    CHANNEL_LAYERS={
+        'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}
+    }
+)
+class BroadcastNotificationTest(TransactionTestCase):
+    """Подключенные пользователи получают уведомления о событиях для всех."""
+
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(
+                email=f'user{index}@example.com', password='password',
+                first_name='Иван', last_name='Иванов'
+            ) for index in range(2)
+        ]
+        unread_cache.invalidate([user.id for user in self.users])
+        # id пользователей повторяются между тестами
+        get_redis().delete(*[
+            get_key(user.id)
+            for user in self.users
+            for get_key in (
+                sequence_key, snapshot_key, delta_key,
+                notification_buffer.window_key,
+                notification_buffer.pending_key,
+                notification_buffer.flush_key,
+            )
+        ])
+        # доставка выполняется задачами Celery
+        eager = celery_app.conf.task_always_eager
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(
+            setattr, celery_app.conf, 'task_always_eager', eager
+        )
+
+    def connect(self, query_string):
+        return WebsocketCommunicator(
+            UserNotifyConsumer.as_asgi(), f'/ws/notifications?{query_string}'
+        )
+
+    async def receive_broadcast(self):
+        first, second = self.users
+        # у первого пользователя открыто два сокета
+        delta_sockets = [
+            self.connect(f'id={first.id}&protocol=2') for _ in range(2)
+        ]
+        list_socket = self.connect(str(second.id))
+        sockets = [*delta_sockets, list_socket]
+        for socket in sockets:
+            connected, _ = await socket.connect()
+            self.assertTrue(connected)
+            message = await socket.receive_json_from()
+            self.assertEqual(message['message']['notifications'], [])
+
+        survey = await sync_to_async(Survey.objects.create)(title='Опрос')
+
+        notification = await sync_to_async(Notification.objects.get)(
+            user=first
+        )
+        for socket in delta_sockets:
+            delta = (await socket.receive_json_from())['message']
+            self.assertEqual(delta, {
+                'seq': 1,
+                'added': [{
+                    'id': notification.id,
+                    'incident_type': Notification.IncidentType.SURVEY,
+                    'incident_id': survey.id,
+                }],
+                'removed': [],
+                'viewed': [],
+            })
+
+        full_list = (await list_socket.receive_json_from())['message']
+        self.assertEqual(
+            [item['incident_id'] for item in full_list['notifications']],
+            [survey.id]
+        )
+
+        for socket in sockets:
+            self.assertTrue(await socket.receive_nothing())
+            await socket.disconnect()
+
+    def test_connected_users_receive_broadcast(self):
+        async_to_sync(self.receive_broadcast)()
@@ -0,0 +1,44 @@
+from unittest import mock, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+
+from notifications.models import Notification
+from notifications.partitions import notification_partitions
+from notifications.service import notification_service
+
+User = get_user_model()
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Только PostgreSQL.')
+class PartitionedUniquenessTest(TestCase):
+    """В секционированной таблице сохраняется одно уведомление в день."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='user@example.com', password='password',
+            first_name='Иван', last_name='Иванов'
+        )
+
+    def setUp(self):
+        notification_partitions.setup(months_ahead=1)
+
+    def build(self):
+        return Notification(
+            incident_type=Notification.IncidentType.SURVEY,
+            incident_id=1,
+            user=self.user
+        )
+
+    def test_duplicate_rejected(self):
+        Notification.objects.bulk_create([self.build()])
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Notification.objects.bulk_create([self.build()])
+
+    def test_bulk_notify_skips_duplicates(self):
+        with mock.patch.object(notification_service, 'fan_out'):
+            notification_service.bulk_notify([self.build()])
+            notification_service.bulk_notify([self.build()])
+        self.assertEqual(Notification.objects.count(), 1)
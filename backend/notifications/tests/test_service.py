@@ -0,0 +1,69 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from notifications.models import Notification
+from notifications.service import notification_service
+from notifications.unread import unread_cache
+
+User = get_user_model()
+
+
+class BulkNotifyUnreadCacheTest(TestCase):
+    """Уведомления, созданные `bulk_notify`, попадают в кэш."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(
+                email=f'user{index}@example.com', password='password',
+                first_name='Иван', last_name='Иванов'
+            ) for index in range(2)
+        ]
+
+    def setUp(self):
+        user_ids = [user.id for user in self.users]
+        unread_cache.invalidate(user_ids)
+        for user_id in user_ids:
+            unread_cache.get(user_id)
+
+    def notify(self, incident_id):
+        # доставка перезаписывает кэш из БД, проверяется только bulk_notify
+        with mock.patch.object(notification_service, 'fan_out'), \
+                self.captureOnCommitCallbacks(execute=True):
+            notification_service.bulk_notify([
+                Notification(
+                    incident_type=Notification.IncidentType.SURVEY,
+                    incident_id=incident_id,
+                    user=user
+                ) for user in self.users
+            ])
+
+    def get_unread_ids(self, user):
+        return [item['id'] for item in unread_cache.get_list(user.id)]
+
+    def test_cache_holds_new_ids(self):
+        self.notify(1)
+        for user in self.users:
+            ids = list(
+                Notification.objects.filter(user=user).values_list('id', flat=True)
+            )
+            self.assertEqual(len(ids), 1)
+            self.assertEqual(self.get_unread_ids(user), ids)
+            self.assertEqual(unread_cache.get_count(user.id), 1)
+
+    def test_cache_after_daily_duplicates(self):
+        self.notify(1)
+        self.notify(1)
+        self.notify(2)
+        for user in self.users:
+            ids = list(
+                Notification.objects
+                .filter(user=user)
+                .order_by('-id')
+                .values_list('id', flat=True)
+            )
+            self.assertEqual(len(ids), 2)
+            self.assertEqual(self.get_unread_ids(user), ids)
+            self.assertEqual(unread_cache.get_count(user.id), 2)
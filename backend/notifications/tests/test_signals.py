@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from notifications.buffer import notification_buffer
+from notifications.models import Notification
+from notifications.unread import unread_cache
+from spare_kits.redis import get_redis
+
+User = get_user_model()
+
+
+class CreatedNotificationUnreadCacheTest(TestCase):
+    """Уведомление, созданное в транзакции, учитывается в кэше один раз."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='user@example.com', password='password',
+            first_name='Иван', last_name='Иванов'
+        )
+
+    def setUp(self):
+        get_redis().delete(
+            notification_buffer.window_key(self.user.id),
+            notification_buffer.pending_key(self.user.id),
+            notification_buffer.flush_key(self.user.id),
+        )
+        unread_cache.invalidate([self.user.id])
+        unread_cache.get(self.user.id)
+
+    def create(self, incident_id):
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(
+                incident_type=Notification.IncidentType.SURVEY,
+                incident_id=incident_id,
+                user=self.user
+            )
+
+    def test_immediate_delivery(self):
+        self.create(1)
+        self.assertEqual(unread_cache.get_count(self.user.id), 1)
+
+    def test_delayed_delivery(self):
+        self.create(1)
+        self.create(2)
+        self.assertEqual(unread_cache.get_count(self.user.id), 2)
+        self.assertEqual(len(unread_cache.get_list(self.user.id)), 2)
@@ -0,0 +1,191 @@
+import json
+
+from django.conf import settings
+
+from spare_kits.redis import get_redis
+
+from .models import Notification
+
+ADD_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('INCRBY', KEYS[1], ARGV[1])
+for i = 4, #ARGV, 2 do
+    redis.call('ZADD', KEYS[2], ARGV[i], ARGV[i + 1])
+end
+redis.call('ZREMRANGEBYRANK', KEYS[2], 0, -tonumber(ARGV[2]) - 1)
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return 1
+"""
+
+REMOVE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+if redis.call('DECRBY', KEYS[1], ARGV[1]) < 0 then
+    redis.call('SET', KEYS[1], 0, 'KEEPTTL')
+end
+for i = 2, #ARGV do
+    redis.call('ZREMRANGEBYSCORE', KEYS[2], ARGV[i], ARGV[i])
+end
+return 1
+"""
+
+
+class UnreadCache:
+    """
+    Количество и последние непросмотренные уведомления пользователя в Redis.
+
+    Хранится счетчик и не больше `NOTIFICATIONS_UNREAD_CACHE_SIZE`
+    последних уведомлений. Если уведомлений больше, полный список читается
+    из БД. Изменения применяются Lua-скриптами только к уже загруженным
+    данным, незагруженные данные читаются из БД при первом обращении.
+    Каждая доставка уведомлений перезаписывает данные актуальным списком.
+    """
+
+    prefix = 'notifications:unread'
+    timeout = 24 * 60 * 60
+    fields = ('id', 'incident_type', 'incident_id')
+
+    def __init__(self):
+        self._add = None
+        self._remove = None
+
+    @property
+    def size(self) -> int:
+        return settings.NOTIFICATIONS_UNREAD_CACHE_SIZE
+
+    def count_key(self, user_id) -> str:
+        return f'{self.prefix}:count:{user_id}'
+
+    def items_key(self, user_id) -> str:
+        return f'{self.prefix}:items:{user_id}'
+
+    def get_scripts(self):
+        if self._add is None:
+            redis = get_redis()
+            self._add = redis.register_script(ADD_SCRIPT)
+            self._remove = redis.register_script(REMOVE_SCRIPT)
+        return self._add, self._remove
+
+    def encode(self, item: dict) -> str:
+        return json.dumps(
+            [item[field] for field in self.fields], ensure_ascii=False
+        )
+
+    def decode(self, value: str) -> dict:
+        return dict(zip(self.fields, json.loads(value)))
+
+    def store(self, pipe, user_id, count: int, items: list):
+        """Добавляет в `pipe` команды записи данных пользователя."""
+        pipe.set(self.count_key(user_id), count, ex=self.timeout)
+        pipe.delete(self.items_key(user_id))
+        if items:
+            pipe.zadd(self.items_key(user_id), {
+                self.encode(item): item['id'] for item in items[:self.size]
+            })
+            pipe.expire(self.items_key(user_id), self.timeout)
+
+    def load(self, user_id) -> tuple:
+        """Читает данные пользователя из БД и сохраняет их в Redis."""
+        queryset = Notification.objects.filter(
+            user_id=user_id, is_viewed=False
+        )
+        count = queryset.count()
+        items = list(queryset.order_by('-id').values(*self.fields)[:self.size])
+        with get_redis().pipeline() as pipe:
+            self.store(pipe, user_id, count, items)
+            pipe.execute()
+        return count, items
+
+    def get(self, user_id) -> tuple:
+        """
+        Количество и последние непросмотренные уведомления пользователя.
+
+        Returns:
+            tuple: количество и список уведомлений, начиная с новых.
+        """
+        with get_redis().pipeline(transaction=False) as pipe:
+            pipe.get(self.count_key(user_id))
+            pipe.zrevrange(self.items_key(user_id), 0, -1)
+            count, items = pipe.execute()
+        if count is None:
+            return self.load(user_id)
+        return int(count), [self.decode(item) for item in items]
+
+    def get_count(self, user_id) -> int:
+        count = get_redis().get(self.count_key(user_id))
+        if count is None:
+            count, _ = self.load(user_id)
+        return int(count)
+
+    def get_list(self, user_id):
+        """Полный список непросмотренных уведомлений или None."""
+        count, items = self.get(user_id)
+        if count == len(items):
+            return items
+        return None
+
+    def refresh(self, unread: dict):
+        """Перезаписывает данные пользователей актуальными списками."""
+        with get_redis().pipeline() as pipe:
+            for user_id, items in unread.items():
+                items = sorted(items, key=lambda item: -item['id'])
+                self.store(pipe, user_id, len(items), items)
+            pipe.execute()
+
+    def add(self, notifications: list):
+        """Учитывает новые непросмотренные уведомления."""
+        by_user = {}
+        for notification in notifications:
+            if notification.pk and not notification.is_viewed:
+                by_user.setdefault(notification.user_id, []).append(
+                    notification
+                )
+        if not by_user:
+            return
+
+        add, _ = self.get_scripts()
+        with get_redis().pipeline(transaction=False) as pipe:
+            for user_id, items in by_user.items():
+                args = [len(items), self.size, self.timeout]
+                for item in items[-self.size:]:
+                    args.extend((item.pk, self.encode({
+                        'id': item.pk,
+                        'incident_type': item.incident_type,
+                        'incident_id': item.incident_id,
+                    })))
+                add(
+                    keys=[self.count_key(user_id), self.items_key(user_id)],
+                    args=args,
+                    client=pipe
+                )
+            pipe.execute()
+
+    def remove(self, user_id, count: int, ids=()):
+        """Учитывает `count` просмотренных или удаленных уведомлений."""
+        _, remove = self.get_scripts()
+        remove(
+            keys=[self.count_key(user_id), self.items_key(user_id)],
+            args=[count, *ids]
+        )
+
+    def reset(self, user_ids):
+        """Отмечает, что у пользователей нет непросмотренных уведомлений."""
+        with get_redis().pipeline() as pipe:
+            for user_id in user_ids:
+                self.store(pipe, user_id, 0, [])
+            pipe.execute()
+
+    def invalidate(self, user_ids):
+        """Сбрасывает данные, они будут прочитаны из БД при обращении."""
+        keys = []
+        for user_id in user_ids:
+            keys.extend((self.count_key(user_id), self.items_key(user_id)))
+        if keys:
+            get_redis().delete(*keys)
+
+
+unread_cache = UnreadCache()
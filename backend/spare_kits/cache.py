@@ -0,0 +1,75 @@
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+class VersionedCache:
+    """
+    Кэш в памяти процесса, согласованный между процессами через Redis.
+
+    Значение хранится в памяти процесса вместе с версией, под которой оно
+    было построено. Актуальная версия хранится в общем кэше, поэтому
+    инвалидация в одном процессе заставляет остальные перестроить значение
+    при следующем обращении. Построенное значение также сохраняется в общем
+    кэше, чтобы его не пересчитывал каждый процесс. При инвалидации
+    значение прежней версии удаляется, а оставшиеся после гонок значения
+    устаревших версий истекают через `timeout`.
+
+    Args:
+        prefix (str): префикс ключей в общем кэше.
+        builder (callable): функция, строящая значение по ключу.
+        timeout (int, optional): время жизни значения в общем кэше,
+            по умолчанию сутки.
+    """
+
+    default_timeout = 24 * 60 * 60
+
+    def __init__(self, prefix: str, builder, timeout: int = None):
+        self.prefix = prefix
+        self.builder = builder
+        self.timeout = timeout or self.default_timeout
+        self._local = {}
+
+    def _version_key(self, key) -> str:
+        return f'{self.prefix}:{key}:version'
+
+    def _value_key(self, key, version: str) -> str:
+        return f'{self.prefix}:{key}:{version}'
+
+    def get_version(self, key) -> str:
+        version_key = self._version_key(key)
+        version = cache.get(version_key)
+        if version is not None:
+            return version
+        cache.add(version_key, uuid4().hex, None)
+        return cache.get(version_key)
+
+    def get(self, key):
+        """Возвращает значение, при необходимости перестраивая его."""
+        version = self.get_version(key)
+        local = self._local.get(key)
+        if local is not None and local[0] == version:
+            return local[1]
+
+        value_key = self._value_key(key, version)
+        value = cache.get(value_key)
+        if value is None:
+            value = self.builder(key)
+            cache.set(value_key, value, self.timeout)
+
+        self._local[key] = (version, value)
+        return value
+
+    def invalidate(self, key):
+        """Сбрасывает значение во всех процессах."""
+        self._local.pop(key, None)
+        version_key = self._version_key(key)
+        previous = cache.get(version_key)
+        cache.set(version_key, uuid4().hex, None)
+        if previous is not None:
+            cache.delete(self._value_key(key, previous))
+
+    def invalidate_on_commit(self, key):
+        """Сбрасывает значение после фиксации текущей транзакции."""
+        transaction.on_commit(lambda: self.invalidate(key))
@@ -0,0 +1,106 @@
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import transaction
+from PIL import Image, UnidentifiedImageError
+
+
+class ImageUploads:
+    """
+    Загрузка изображений без обработки в запросе.
+
+    Файл принимается из multipart-запроса во временный файл на диске,
+    у него проверяются только заголовки, после чего он копируется в
+    хранилище по частям и сохраняется в поле модели. Уменьшение до
+    `max_size` и перекодирование выполняет задача
+    `process_uploaded_image`, она же заменяет файл в поле модели.
+    """
+
+    formats = ('JPEG', 'PNG', 'WEBP', 'GIF')
+    max_size = (600, 600)
+
+    @staticmethod
+    def use_temporary_files(request):
+        """Направляет файлы запроса во временные файлы на диске."""
+        request.upload_handlers = [TemporaryFileUploadHandler(request)]
+
+    def validate(self, upload):
+        """
+        Проверяет файл по заголовкам, не декодируя изображение.
+
+        Raises:
+            ValidationError: файл слишком большой, не является
+            изображением допустимого формата или слишком велик
+            по числу пикселей.
+        """
+        if upload.size > settings.IMAGE_UPLOAD_MAX_SIZE:
+            raise ValidationError(
+                'Размер файла не должен превышать '
+                f'{settings.IMAGE_UPLOAD_MAX_SIZE // 2 ** 20} МБ.'
+            )
+        try:
+            with Image.open(upload) as image:
+                image_format, (width, height) = image.format, image.size
+        except (UnidentifiedImageError, Image.DecompressionBombError):
+            raise ValidationError('Загрузите корректное изображение.')
+        finally:
+            upload.seek(0)
+        if image_format not in self.formats:
+            raise ValidationError(
+                f'Допустимые форматы: {", ".join(self.formats)}.'
+            )
+        if width * height > settings.IMAGE_UPLOAD_MAX_PIXELS:
+            raise ValidationError('Слишком большое разрешение изображения.')
+
+    def save(self, instance, field_name: str, upload, link=None,
+             **fields):
+        """
+        Сохраняет загруженный файл в поле `field_name` объекта.
+
+        Поле и остальные `fields` обновляются запросом без сигналов
+        сохранения модели, обработка файла запускается после коммита.
+        `link` - подпись задачи, выполняемой после обработки.
+        """
+        from .tasks import process_uploaded_image
+
+        field = instance._meta.get_field(field_name)
+        name = field.storage.save(
+            field.generate_filename(instance, os.path.basename(upload.name)),
+            upload,
+            max_length=field.max_length
+        )
+        fields[field_name] = name
+        for attr, value in fields.items():
+            setattr(instance, attr, value)
+        type(instance).objects.filter(pk=instance.pk).update(**fields)
+        args = (instance._meta.label, instance.pk, field_name, name)
+        transaction.on_commit(
+            lambda: process_uploaded_image.apply_async(args, link=link)
+        )
+
+    def resize(self, file) -> ContentFile:
+        """
+        Уменьшает изображение до `max_size` с сохранением формата.
+
+        Returns:
+            ContentFile: новое изображение или None, если изображение
+            уже не больше `max_size`.
+        """
+        with Image.open(file) as image:
+            if (
+                image.size[0] <= self.max_size[0]
+                and image.size[1] <= self.max_size[1]
+            ):
+                return None
+            image_format = image.format
+            image.thumbnail(self.max_size, Image.LANCZOS)
+            output = BytesIO()
+            image.save(output, format=image_format)
+        return ContentFile(output.getvalue())
+
+
+image_uploads = ImageUploads()
@@ -0,0 +1,140 @@
+import json
+import time
+from uuid import uuid4
+
+from django.conf import settings
+from redis.exceptions import ResponseError
+
+from .redis import get_redis
+
+
+class EmailOutbox:
+    """
+    Очередь исходящих писем в Redis Stream.
+
+    Письма добавляются в поток и читаются обработчиками через группу
+    потребителей, поэтому каждое письмо берет только один обработчик.
+    Письмо удаляется из потока после отправки или переноса в очередь
+    повторов. Письма обработчика, завершившегося без подтверждения,
+    забирают другие обработчики через `EMAIL_OUTBOX_CLAIM_TIMEOUT` секунд.
+
+    Неотправленное письмо повторяется с удваивающейся задержкой от
+    `EMAIL_OUTBOX_RETRY_DELAY` секунд, после `EMAIL_OUTBOX_MAX_ATTEMPTS`
+    попыток оно переносится в поток ошибок `emails:dead`.
+    """
+
+    stream = 'emails:outbox'
+    group = 'emails'
+    retry_key = 'emails:retry'
+    dead_stream = 'emails:dead'
+    dead_maxlen = 10000
+
+    def __init__(self):
+        self._group_created = False
+
+    def ensure_group(self):
+        if self._group_created:
+            return
+        try:
+            get_redis().xgroup_create(
+                self.stream, self.group, id='0', mkstream=True
+            )
+        except ResponseError as error:
+            if 'BUSYGROUP' not in str(error):
+                raise
+        self._group_created = True
+
+    def put(self, subject: str, message: str, from_email: str,
+            recipient_list: list, html_message: str = None,
+            template: str = None, context: dict = None):
+        """
+        Добавляет письмо в очередь.
+
+        Письмо с `template` рендерится при отправке `EmailRenderer`
+        из шаблона и контекста, `message` и `html_message` при этом
+        не используются.
+        """
+        self.ensure_group()
+        get_redis().xadd(self.stream, {'data': json.dumps({
+            'id': uuid4().hex,
+            'subject': subject,
+            'message': message,
+            'from_email': from_email,
+            'recipient_list': list(recipient_list),
+            'html_message': html_message,
+            'template': template,
+            'context': context,
+            'attempts': 0,
+        }, ensure_ascii=False)})
+
+    def promote_retries(self) -> int:
+        """Возвращает в очередь письма, время повтора которых наступило."""
+        redis = get_redis()
+        promoted = 0
+        for data in redis.zrangebyscore(self.retry_key, 0, time.time()):
+            # письмо переносит тот обработчик, который удалил его первым
+            if redis.zrem(self.retry_key, data):
+                redis.xadd(self.stream, {'data': data})
+                promoted += 1
+        return promoted
+
+    def claim(self, consumer: str, count: int) -> list:
+        """
+        Забирает письма для отправки обработчиком `consumer`.
+
+        Returns:
+            list: пары из id записи и письма.
+        """
+        self.ensure_group()
+        redis = get_redis()
+        _, entries, *_ = redis.xautoclaim(
+            self.stream, self.group, consumer,
+            min_idle_time=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT * 1000,
+            start_id='0-0', count=count
+        )
+        if not entries:
+            response = redis.xreadgroup(
+                self.group, consumer, {self.stream: '>'}, count=count
+            )
+            entries = response[0][1] if response else []
+        # записи, удаленные из потока, возвращаются без данных
+        return [
+            (entry[0], json.loads(entry[1]['data']))
+            for entry in entries if entry and entry[1]
+        ]
+
+    def ack(self, entry_ids: list):
+        if not entry_ids:
+            return
+        with get_redis().pipeline() as pipe:
+            pipe.xack(self.stream, self.group, *entry_ids)
+            pipe.xdel(self.stream, *entry_ids)
+            pipe.execute()
+
+    def retry(self, email: dict, error: Exception) -> bool:
+        """
+        Планирует повтор письма или переносит его в поток ошибок.
+
+        Returns:
+            bool: False, если письмо перенесено в поток ошибок.
+        """
+        email = dict(email, attempts=email['attempts'] + 1)
+        redis = get_redis()
+        if email['attempts'] >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            redis.xadd(
+                self.dead_stream,
+                {'data': json.dumps(email, ensure_ascii=False),
+                 'error': repr(error)},
+                maxlen=self.dead_maxlen, approximate=True
+            )
+            return False
+        delay = (
+            settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (email['attempts'] - 1)
+        )
+        redis.zadd(self.retry_key, {
+            json.dumps(email, ensure_ascii=False): time.time() + delay
+        })
+        return True
+
+
+email_outbox = EmailOutbox()
@@ -0,0 +1,10 @@
+from functools import lru_cache
+
+import redis
+from django.conf import settings
+
+
+@lru_cache(maxsize=None)
+def get_redis() -> redis.Redis:
+    """Клиент Redis для счетчиков, буферов и других служебных данных."""
+    return redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.template import engines
+from django.template.loader import get_template
+
+
+class EmailRenderer:
+    """
+    Сборка писем из шаблонов `templates/email`.
+
+    Общая разметка `email/base.html` со встроенными стилями рендерится
+    один раз на процесс, а для каждого письма рендерится только его
+    содержимое `email/<name>.html` и текстовая версия `email/<name>.txt`.
+    Скомпилированные шаблоны хранятся в памяти процесса. В режиме
+    `DEBUG` шаблоны перечитываются при каждом письме.
+    """
+
+    layout_template = 'email/base.html'
+    marker = '<!--content-->'
+
+    def __init__(self):
+        self._layout = None
+        self._templates = {}
+
+    def get_layout(self) -> tuple:
+        """Разметка письма до и после содержимого."""
+        if self._layout is None or settings.DEBUG:
+            layout = engines['django'].from_string(
+                f"{{% extends '{self.layout_template}' %}}"
+                f'{{% block content %}}{self.marker}{{% endblock %}}'
+            ).render({})
+            before, after = layout.split(self.marker)
+            self._layout = before, after
+        return self._layout
+
+    def get_template(self, name: str):
+        if settings.DEBUG:
+            return get_template(name)
+        if name not in self._templates:
+            self._templates[name] = get_template(name)
+        return self._templates[name]
+
+    def render(self, name: str, context: dict) -> tuple:
+        """
+        Рендерит письмо.
+
+        Returns:
+            tuple: HTML и текстовая версия письма.
+        """
+        before, after = self.get_layout()
+        content = self.get_template(f'email/{name}.html').render(context)
+        text = self.get_template(f'email/{name}.txt').render(context)
+        return before + content + after, text
+
+
+email_renderer = EmailRenderer()
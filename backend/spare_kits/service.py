@@ -3,12 +3,11 @@ import hashlib
 from email.utils import formataddr
 
 from django.conf import settings
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
 from drf_yasg import openapi
 from rest_framework.exceptions import ValidationError
 
-from .tasks import send_mail_via_celery, send_mass_mail_via_celery
+from .outbox import email_outbox
+from .tasks import schedule_outbox_drain
 
 
 class EmailService:
@@ -20,23 +19,47 @@ class EmailService:
         recipient_list,
         html_message=None
     ):
-        """Отправка email-сообщения пользователю."""
-        send_mail_via_celery.delay(
+        """Отправка email-сообщения пользователю через очередь писем."""
+        email_outbox.put(
             subject,
             message,
             from_email,
             recipient_list,
             html_message=html_message,
         )
+        schedule_outbox_drain()
+
+    def send_template_email(
+        self,
+        subject,
+        template,
+        context,
+        recipient_list
+    ):
+        """
+        Отправка письма из шаблона `email/<template>`.
+
+        Письмо рендерится при отправке из очереди, контекст должен
+        сериализоваться в JSON.
+        """
+        email_outbox.put(
+            subject,
+            '',
+            formataddr(('MoodBeat', settings.EMAIL_HOST_USER)),
+            recipient_list,
+            template=template,
+            context=context,
+        )
+        schedule_outbox_drain()
 
     def send_mass_email(
         self,
         datatuple
     ):
-        """Отправка нескольких email-сообщений за раз."""
-        send_mass_mail_via_celery(
-            datatuple
-        )
+        """Отправка нескольких email-сообщений за раз через очередь писем."""
+        for subject, message, from_email, recipient_list in datatuple:
+            email_outbox.put(subject, message, from_email, recipient_list)
+        schedule_outbox_drain()
 
 
 class SecretCodeService:
@@ -85,18 +108,11 @@ class InviteService(SecretCodeService, EmailService):
         subject = 'Регистрация на нашем сервисе'
         if again:
             subject = 'Вам отправлена повторная ссылка для регистрации'
-        html_message = render_to_string(
-            'email/send_invitation_link.html',
-            {'url': url},
-        )
-        message = strip_tags(html_message)
-
-        self.send_email(
+        self.send_template_email(
             subject,
-            message,
-            formataddr(('MoodBeat', settings.EMAIL_HOST_USER)),
+            'send_invitation_link',
+            {'url': url},
             [email],
-            html_message=html_message,
         )
 
     def send_reset_code(self, email: str, code: str, again: bool = False):
@@ -107,18 +123,11 @@ class InviteService(SecretCodeService, EmailService):
         subject = 'Ваша ссылка для смены пароля'
         if again:
             subject = 'Вам отправлена повторная ссылка на смену пароля'
-        html_message = render_to_string(
-            'email/send_password_restore_email.html',
-            {'url': url},
-        )
-        message = strip_tags(html_message)
-
-        self.send_email(
+        self.send_template_email(
             subject,
-            message,
-            formataddr(('MoodBeat', settings.EMAIL_HOST_USER)),
+            'send_password_restore_email',
+            {'url': url},
             [email],
-            html_message=html_message,
         )
 
     def send_telegram_code(self, email: str, code: str, again: bool = False):
@@ -129,18 +138,11 @@ class InviteService(SecretCodeService, EmailService):
         subject = 'Ваш код для авторизации в боте'
         if again:
             subject = 'Вам повторно отправлен код для авторизации в боте'
-        html_message = render_to_string(
-            'email/send_telegram_code.html',
-            {'url': url, 'code': code},
-        )
-        message = strip_tags(html_message)
-
-        self.send_email(
+        self.send_template_email(
             subject,
-            message,
-            formataddr(('MoodBeat', settings.EMAIL_HOST_USER)),
+            'send_telegram_code',
+            {'url': url, 'code': code},
             [email],
-            html_message=html_message,
         )
 
 
@@ -151,18 +153,11 @@ class NotificationEmailService(EmailService):
         """Отправляет пользователю `email` напоминание о новых событиях."""
         url = self.host
         subject = 'Новые уведомления'
-        html_message = render_to_string(
-            'email/send_new_notifications.html',
-            {'incident_type': incident_type, 'url': url},
-        )
-        message = strip_tags(html_message)
-
-        self.send_email(
+        self.send_template_email(
             subject,
-            message,
-            formataddr(('MoodBeat', settings.EMAIL_HOST_USER)),
+            'send_new_notifications',
+            {'incident_type': incident_type, 'url': url},
             [user.email],
-            html_message=html_message,
         )
 
 
@@ -173,18 +168,11 @@ class ContactMessageEmailService(EmailService):
         """Отправляет пользователю `email` с сообщением из контактной формы."""
         contact_email = self.contact_email
         subject = 'Обратная связь'
-        html_message = render_to_string(
-            'email/send_contact_form.html',
-            {'name': name, 'email': email, 'comment': comment},
-        )
-        message = strip_tags(html_message)
-
-        self.send_email(
+        self.send_template_email(
             subject,
-            message,
-            formataddr(('MoodBeat', settings.EMAIL_HOST_USER)),
+            'send_contact_form',
+            {'name': name, 'email': email, 'comment': comment},
             [contact_email],
-            html_message=html_message,
         )
 
 
@@ -1,7 +1,25 @@
+import logging
+import os
+import socket
+import time
+
 from celery import shared_task
-from django.core.mail import send_mail, send_mass_mail
+from django.apps import apps
+from django.conf import settings
+from django.core.mail import (EmailMultiAlternatives, get_connection,
+                              send_mail, send_mass_mail)
+
+from .images import image_uploads
+from .outbox import email_outbox
+from .redis import get_redis
+from .rendering import email_renderer
 
+logger = logging.getLogger(__name__)
 
+
+# Письма отправляются через очередь `email_outbox`. Задачи send_mail и
+# send_mass_mail больше не ставятся и оставлены только для отправки писем,
+# поставленных в брокер до обновления; их можно удалить в следующем релизе.
 @shared_task(name='send_mail', ignore_result=True, rate_limit='1/m')
 def send_mail_via_celery(
     subject,
@@ -42,3 +60,150 @@ def send_mass_mail_via_celery(
         auth_password,
         connection,
     )
+
+
+def build_outbox_message(email: dict, connection):
+    text, html_message = email['message'], email['html_message']
+    if email.get('template'):
+        html_message, text = email_renderer.render(
+            email['template'], email['context'] or {}
+        )
+    message = EmailMultiAlternatives(
+        email['subject'],
+        text,
+        email['from_email'],
+        email['recipient_list'],
+        connection=connection,
+    )
+    if html_message:
+        message.attach_alternative(html_message, 'text/html')
+    return message
+
+
+def send_outbox_batch(batch: list) -> dict:
+    """
+    Отправляет пачку писем через одно SMTP-соединение.
+
+    Скорость отправки ограничена `EMAIL_OUTBOX_RATE` писем в секунду.
+
+    Returns:
+        dict: количество отправленных, отложенных для повтора и
+        перенесенных в поток ошибок писем.
+    """
+    result = {'sent': 0, 'retried': 0, 'dead': 0}
+
+    def fail(email, error):
+        result['retried' if email_outbox.retry(email, error) else 'dead'] += 1
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for _, email in batch:
+            fail(email, error)
+        email_outbox.ack([entry_id for entry_id, _ in batch])
+        return result
+
+    rate = settings.EMAIL_OUTBOX_RATE
+    processed = []
+    try:
+        for entry_id, email in batch:
+            started = time.monotonic()
+            try:
+                build_outbox_message(email, connection).send()
+                result['sent'] += 1
+            except Exception as error:
+                fail(email, error)
+            processed.append(entry_id)
+            if rate:
+                time.sleep(max(1 / rate - (time.monotonic() - started), 0))
+    finally:
+        connection.close()
+        # необработанные письма заберет другой обработчик
+        email_outbox.ack(processed)
+    return result
+
+
+def send_outbox(time_budget: int) -> bool:
+    """
+    Отправляет письма из очереди в течение `time_budget` секунд.
+
+    Returns:
+        bool: опустела ли очередь.
+    """
+    consumer = f'{socket.gethostname()}-{os.getpid()}'
+    started = time.monotonic()
+    email_outbox.promote_retries()
+    while time.monotonic() - started < time_budget:
+        batch = email_outbox.claim(consumer, settings.EMAIL_OUTBOX_BATCH_SIZE)
+        if not batch:
+            return True
+        batch_started = time.monotonic()
+        result = send_outbox_batch(batch)
+        logger.info(
+            'Пачка писем: отправлено %(sent)s, отложено %(retried)s, '
+            'ошибок %(dead)s за %(duration).2f с',
+            dict(result, duration=time.monotonic() - batch_started)
+        )
+    return False
+
+
+@shared_task(name='drain_email_outbox', ignore_result=True)
+def drain_email_outbox():
+    """
+    Отправляет письма из очереди `EmailOutbox` пачками.
+
+    Одновременно работает только одна задача, поэтому скорость отправки
+    `EMAIL_OUTBOX_RATE` не зависит от числа обработчиков. Задача
+    работает не дольше `EMAIL_OUTBOX_TIME_BUDGET` секунд и, если очередь
+    не опустела, запускается снова.
+    """
+    # блокировка истекает вместе с захватом писем упавшим обработчиком
+    lock = get_redis().lock(
+        'emails:outbox:drain', timeout=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT
+    )
+    if not lock.acquire(blocking=False):
+        return
+    try:
+        drained = send_outbox(settings.EMAIL_OUTBOX_TIME_BUDGET)
+    finally:
+        lock.release()
+    if not drained:
+        drain_email_outbox.delay()
+
+
+def schedule_outbox_drain():
+    """
+    Запускает отправку очереди писем с небольшой задержкой.
+
+    Письма, добавленные за время задержки, отправляются той же задачей.
+    """
+    delay = settings.EMAIL_OUTBOX_DELAY
+    # Redis не принимает нулевое время жизни ключа
+    if get_redis().set(
+        'emails:outbox:scheduled', 1, nx=True, ex=max(delay, 1)
+    ):
+        drain_email_outbox.apply_async(countdown=delay)
+
+
+@shared_task(name='process_uploaded_image')
+def process_uploaded_image(model_label, pk, field_name, name):
+    """
+    Уменьшает загруженное изображение и заменяет им файл в поле модели.
+
+    Файл в поле не заменяется, если его успели изменить: тогда
+    удаляется уменьшенная копия, иначе - исходный файл.
+    """
+    model = apps.get_model(model_label)
+    storage = model._meta.get_field(field_name).storage
+    if not storage.exists(name):
+        return
+    with storage.open(name) as file:
+        resized = image_uploads.resize(file)
+    if resized is None:
+        return
+    resized_name = storage.save(name, resized)
+    updated = model.objects.filter(pk=pk, **{field_name: name}).update(
+        **{field_name: resized_name}
+    )
+    storage.delete(name if updated else resized_name)
@@ -4,6 +4,7 @@ from django.contrib.auth.admin import UserAdmin
 from django.db.models import Count
 
 from .models import Department, Hobby, InviteCode, MentalState, Position
+from .registry import mental_states
 
 User = get_user_model()
 
@@ -19,6 +20,16 @@ class EmployeesCountMixin:
     employees_count.short_description = 'Сотрудников'
 
 
+class MentalStateDisplayMixin:
+    """Вывод состояния из реестра без join'а к `MentalState`."""
+
+    def mental_state_display(self, obj):
+        return mental_states.get_by_id(obj.mental_state_id)
+
+    mental_state_display.short_description = 'Состояние'
+    mental_state_display.admin_order_field = 'mental_state'
+
+
 class UserInline(admin.TabularInline):
     model = User
     fields = ('last_name', 'first_name', 'email', 'phone')
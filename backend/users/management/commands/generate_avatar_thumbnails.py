@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from users.tasks import generate_avatar_thumbnails, get_avatar_user_ids
+
+
+class Command(BaseCommand):
+    help = 'Создает миниатюры загруженных ранее аватаров.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Пересоздать миниатюры всех аватаров, а не только '
+                 'аватаров без миниатюр.'
+        )
+        parser.add_argument(
+            '--sync',
+            action='store_true',
+            help='Создать миниатюры в команде, а не задачами Celery.'
+        )
+
+    def handle(self, *args, **options):
+        user_ids = get_avatar_user_ids(missing_only=not options['all'])
+        count = 0
+        for user_id in user_ids.iterator():
+            if options['sync']:
+                generate_avatar_thumbnails(user_id)
+            else:
+                generate_avatar_thumbnails.delay(user_id)
+            count += 1
+        self.stdout.write(f'Аватаров обработано: {count}')
@@ -149,7 +149,52 @@ class MentalState(models.Model):
         return self.name
 
 
-class User(AbstractBaseUser, PermissionsMixin):
+class TrackedFieldsMixin:
+    """
+    Отслеживание изменений полей модели без запросов к БД.
+
+    Значения полей из `tracked_fields` запоминаются при загрузке объекта
+    и после каждого сохранения.
+    """
+
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = instance.get_tracked_values()
+        return instance
+
+    def get_tracked_values(self) -> dict:
+        """Текущие значения `tracked_fields`, кроме отложенных полей."""
+        values = {}
+        for name in self.tracked_fields:
+            attname = self._meta.get_field(name).attname
+            if attname in self.__dict__:
+                value = self.__dict__[attname]
+                values[name] = getattr(value, 'name', value) or None
+        return values
+
+    def has_changed(self, name: str, update_fields=None) -> bool:
+        """
+        Изменилось ли поле из `tracked_fields` с загрузки или сохранения.
+
+        Сравнение выполняется без запроса к БД, по значениям, с которыми
+        объект был загружен или последний раз сохранен.
+        """
+        if update_fields is not None and name not in update_fields:
+            return False
+        loaded = getattr(self, '_loaded_values', {})
+        if name not in loaded:
+            return False
+        return self.get_tracked_values().get(name) != loaded[name]
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_values = self.get_tracked_values()
+
+
+class User(TrackedFieldsMixin, AbstractBaseUser, PermissionsMixin):
 
     HR = 'hr'
     CHIEF = 'chief'
@@ -231,6 +276,12 @@ class User(AbstractBaseUser, PermissionsMixin):
         blank=True,
         null=True
     )
+    avatar_thumbnails = models.JSONField(
+        verbose_name='Миниатюры аватара',
+        default=dict,
+        blank=True,
+        editable=False
+    )
     about = models.TextField(
         verbose_name='О себе',
         max_length=256,
@@ -259,6 +310,9 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     objects = UserManager()
 
+    # поля, изменение которых проверяется в обработчиках сигналов
+    tracked_fields = ('department', 'avatar_full')
+
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['first_name', 'last_name']
 
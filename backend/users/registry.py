@@ -0,0 +1,44 @@
+from spare_kits.cache import VersionedCache
+
+from .models import MentalState
+
+
+class MentalStateRegistry:
+    """
+    Реестр психологических состояний.
+
+    Состояний всего несколько и они практически не меняются, поэтому
+    хранятся в памяти процесса. Кэш сбрасывается сигналами при изменении
+    любого состояния.
+    """
+
+    def __init__(self):
+        self._cache = VersionedCache('mental_states', self._build)
+
+    @staticmethod
+    def _build(key) -> dict:
+        states = list(MentalState.objects.order_by('level', 'id'))
+        levels = {}
+        for state in states:
+            levels.setdefault(state.level, state)
+        return {
+            'levels': levels,
+            'ids': {state.pk: state for state in states},
+        }
+
+    def all(self) -> list:
+        return list(self._cache.get('states')['ids'].values())
+
+    def get(self, level: int):
+        """Возвращает состояние по уровню."""
+        return self._cache.get('states')['levels'].get(level)
+
+    def get_by_id(self, pk: int):
+        """Возвращает состояние по идентификатору."""
+        return self._cache.get('states')['ids'].get(pk)
+
+    def invalidate(self):
+        self._cache.invalidate_on_commit('states')
+
+
+mental_states = MentalStateRegistry()
@@ -0,0 +1,34 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from ..models import MentalState, User
+from ..registry import mental_states
+from ..tasks import generate_avatar_thumbnails
+
+
+@receiver(post_save, sender=MentalState)
+@receiver(post_delete, sender=MentalState)
+def invalidate_mental_states(sender, instance, **kwargs):
+    """Сбрасывает реестр состояний при изменении `MentalState`."""
+    mental_states.invalidate()
+
+
+@receiver(pre_save, sender=User)
+def reset_avatar_thumbnails(sender, instance, update_fields, **kwargs):
+    """Сбрасывает миниатюры аватара при его замене или удалении."""
+    if instance.has_changed('avatar_full', update_fields):
+        instance.avatar_thumbnails = {}
+
+
+@receiver(post_save, sender=User)
+def create_avatar_thumbnails(sender, instance, created, update_fields,
+                             **kwargs):
+    """Запускает создание миниатюр нового аватара после коммита."""
+    if not instance.avatar_full:
+        return
+    if created or instance.has_changed('avatar_full', update_fields):
+        user_id = instance.id
+        transaction.on_commit(
+            lambda: generate_avatar_thumbnails.delay(user_id)
+        )
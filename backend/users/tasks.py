@@ -0,0 +1,50 @@
+from celery import shared_task
+from django.contrib.auth import get_user_model
+
+from .thumbnails import avatar_thumbnailer
+
+User = get_user_model()
+
+
+def get_avatar_user_ids(missing_only: bool = True):
+    """Id пользователей с аватаром, по умолчанию - только без миниатюр."""
+    users = User.objects.exclude(avatar_full='').exclude(
+        avatar_full__isnull=True
+    )
+    if missing_only:
+        users = users.filter(avatar_thumbnails={})
+    return users.values_list('id', flat=True)
+
+
+@shared_task(
+    name='generate_avatar_thumbnails',
+    autoretry_for=(OSError,),
+    retry_backoff=True,
+    max_retries=3
+)
+def generate_avatar_thumbnails(user_id):
+    """
+    Создает миниатюры аватара пользователя и сохраняет их адреса.
+
+    Адреса не сохраняются, если аватар успели заменить или удалить:
+    для нового аватара запускается своя задача.
+    """
+    user = User.objects.filter(id=user_id).only('avatar_full').first()
+    if user is None or not user.avatar_full:
+        return
+    thumbnails = avatar_thumbnailer.generate(user.avatar_full)
+    User.objects.filter(
+        id=user_id, avatar_full=user.avatar_full.name
+    ).update(avatar_thumbnails=thumbnails)
+
+
+@shared_task(name='generate_missing_avatar_thumbnails', ignore_result=True)
+def generate_missing_avatar_thumbnails():
+    """
+    Запускает создание миниатюр аватаров, оставшихся без них.
+
+    Повторяет задачи, которые не удалось выполнить при загрузке,
+    чтобы в списках не отдавались исходные аватары.
+    """
+    for user_id in get_avatar_user_ids().iterator():
+        generate_avatar_thumbnails.delay(user_id)
@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from users.models import InviteCode, PasswordResetCode, TelegramCode
+
+User = get_user_model()
+
+
+class CodeModelsTest(TestCase):
+    """Коды приглашений, сброса пароля и бота сохраняются и читаются."""
+
+    def test_save_and_load(self):
+        InviteCode(email='Invite@Example.com').save()
+        PasswordResetCode(email='Reset@Example.com').save()
+        TelegramCode(email='Bot@Example.com', code=123456).save()
+        self.assertEqual(
+            [code.email for code in InviteCode.objects.all()],
+            ['invite@example.com']
+        )
+        self.assertEqual(
+            [code.email for code in PasswordResetCode.objects.all()],
+            ['reset@example.com']
+        )
+        self.assertEqual(
+            [code.email for code in TelegramCode.objects.all()],
+            ['bot@example.com']
+        )
+
+
+class UserTrackedFieldsTest(TestCase):
+    """Изменение отслеживаемых полей определяется без запросов."""
+
+    def test_has_changed(self):
+        user = User.objects.create_user(
+            email='user@example.com', password='password',
+            first_name='Иван', last_name='Иванов'
+        )
+        user = User.objects.get(pk=user.pk)
+        self.assertFalse(user.has_changed('avatar_full'))
+        user.avatar_full = 'avatars/new.jpg'
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_changed('avatar_full'))
+        self.assertFalse(user.has_changed('avatar_full', ['first_name']))
+        user.save()
+        self.assertFalse(user.has_changed('avatar_full'))
@@ -0,0 +1,45 @@
+from sorl.thumbnail import get_thumbnail
+
+
+class AvatarThumbnailer:
+    """
+    Миниатюры аватаров пользователей.
+
+    Миниатюры всех размеров создаются задачей при загрузке аватара,
+    а их адреса сохраняются в поле `avatar_thumbnails` пользователя,
+    поэтому сериализаторы получают их без обращения к хранилищу.
+    Каждый размер сохраняется в формате JPEG и WebP, ключи словаря -
+    размер и расширение: `120x120`, `120x120.webp`.
+    """
+
+    sizes = ('120x120', '240x240', '600x600')
+    formats = (('', 'JPEG'), ('.webp', 'WEBP'))
+    default_size = '120x120'
+    quality = 99
+
+    def generate(self, image) -> dict:
+        """Создает миниатюры изображения и возвращает их адреса."""
+        thumbnails = {}
+        for size in self.sizes:
+            for suffix, image_format in self.formats:
+                thumbnails[size + suffix] = get_thumbnail(
+                    image, size, crop='center', quality=self.quality,
+                    format=image_format
+                ).url
+        return thumbnails
+
+    def get_url(self, user, size: str = None):
+        """
+        Адрес миниатюры аватара пользователя.
+
+        Пока миниатюры не созданы, возвращается адрес исходного аватара.
+        Аватары, для которых задача не выполнилась, обрабатываются
+        повторно задачей `generate_missing_avatar_thumbnails`.
+        """
+        if not user.avatar_full:
+            return None
+        url = user.avatar_thumbnails.get(size or self.default_size)
+        return url or user.avatar_full.url
+
+
+avatar_thumbnailer = AvatarThumbnailer()